@@ -1,3 +1,4 @@
+import argparse
 import sys
 import warnings
 import io
@@ -5,6 +6,13 @@ sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 import os
+
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    # Run the simulator without loading Qt at all
+    from headless import main as headless_main
+    sys.argv.remove("--headless")
+    sys.exit(headless_main())
+
 from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import (
     QHeaderView,
@@ -36,241 +44,10 @@ from PyQt5.QtGui import QIcon, QPixmap, QPalette, QBrush, QLinearGradient, QColo
     QCursor
 from datetime import datetime
 import time
-import random
-from threading import Thread
-from enum import Enum
-from datetime import datetime
-
-
-# The scheduler implements a priority-based Round-Robin algorithm where:
-# - Higher priority processes get more CPU time
-# - Only 3 processes can run simultaneously
-# - Processes randomly switch between states to simulate real system behavior
-
-# memory management
-class MemoryPage:
-    def __init__(self):
-        self.is_used = False
-        self.process_id = None
-        self.last_used = time.time()
-
-class MemoryManager:
-    def __init__(self, total_pages=100):
-        self.pages = [MemoryPage() for _ in range(total_pages)]
-        self.page_faults = 0
-
-    def allocate_page(self, pid):
-        for page in self.pages:
-            if not page.is_used:
-                page.is_used = True
-                page.process_id = pid
-                page.last_used = time.time()
-                return True
-        self.page_faults += 1
-        return False
-
-    def free_pages(self, pid):
-        for page in self.pages:
-            if page.process_id == pid:
-                page.is_used = False
-                page.process_id = None
-
-class ProcessMemory:
-    def __init__(self, pid):
-        self.pid = pid
-        self.page_count = 0
-
-    def allocate(self, memory_manager, pages_needed):
-        allocated = 0
-        for _ in range(pages_needed):
-            if memory_manager.allocate_page(self.pid):
-                allocated += 1
-        self.page_count += allocated
-        return allocated
-
-    def free(self, memory_manager):
-        memory_manager.free_pages(self.pid)
-        self.page_count = 0  # Reset page_count when freed
-
-
-class ProcessState(Enum):
-    READY = "Ready"
-    RUNNING = "Running"
-    WAITING = "Waiting"
-    BLOCKED = "Blocked"
-    TERMINATED = "Terminated"
-
-
-class DummyProcess:
-    def __init__(self, pid, name, priority, memory_manager):
-        self.pid = pid
-        self.name = name
-        self.priority = priority
-        self.state = ProcessState.READY
-        self.cpu_usage = 0
-        self.start_time = time.time()
-        self.last_state_change = time.time()
-        self.thread = None
-        self.is_running = True
-        self.status = ""
-        # Memory allocation based on priority
-        self.memory = ProcessMemory(pid)
-        pages_needed = priority * 2
-        self.memory.allocate(memory_manager, pages_needed)
-        self.memory_manager = memory_manager
-
-
-    def run(self):
-        while self.is_running:
-            if self.state == ProcessState.RUNNING:
-                # Simulate CPU usage between 1-100%
-                self.cpu_usage = random.randint(1, 100)
-
-                # Randomly change state
-                if random.random() < 0.1:  # 10% chance to change state
-                    new_state = random.choice([
-                        ProcessState.WAITING,
-                        ProcessState.BLOCKED,
-                        ProcessState.READY
-                    ])
-                    self.change_state(new_state)
-
-            elif self.state == ProcessState.READY:
-                self.cpu_usage = 0
-                if random.random() < 0.3:  # 30% chance to start running
-                    self.change_state(ProcessState.RUNNING)
-
-            elif self.state in [ProcessState.WAITING, ProcessState.BLOCKED]:
-                self.cpu_usage = 0
-                if random.random() < 0.2:  # 20% chance to become ready
-                    self.change_state(ProcessState.READY)
-
-            time.sleep(1)  # Update every second
-
-    def change_state(self, new_state):
-        self.state = new_state
-        self.last_state_change = time.time()
-
-    def start(self):
-        self.thread = Thread(target=self.run, daemon=True)
-        self.thread.start()
-
-    def stop(self):
-        self.is_running = False
-        self.state = ProcessState.TERMINATED
-
-_DUMMY_PROCESSES_CREATED = False
-
-class ProcessScheduler:
-    def __init__(self):
-        self.process_manager = ProcessManager()
-        self.memory_manager = MemoryManager()
-        self.current_pid = ProcessManager._next_pid  # Sync PID counter
-        self._dummy_processes_created = False
-        self.create_dummy_processes()
-
-        self.scheduler_thread = Thread(target=self.schedule_processes, daemon=True)
-        self.scheduler_thread.start()
-
-
-
-    def create_dummy_processes(self):
-        global _DUMMY_PROCESSES_CREATED
-
-        if _DUMMY_PROCESSES_CREATED:
-            return
-        process_types = [
-            ("Background Service", 1),
-            ("System Monitor", 3),
-            ("File Indexer", 1),
-            ("Update Service", 2),
-            ("Cache Manager", 1),
-            ("Network Service", 2),
-            ("Security Scanner", 3),
-            ("Backup Service", 1),
-            ("Print Spooler", 2),
-            ("Search Indexer", 1)
-        ]
-        for name, priority in process_types:
-            self.process_manager.create_process(name, priority, self.memory_manager)
-        _DUMMY_PROCESSES_CREATED = True  # Set the global flag after creation
-
-
-
-
-    def terminate_process(self, pid):
-        self.process_manager.terminate_process(pid)
-
-    def get_all_processes(self):
-        return [
-            {
-                'pid': p.pid,
-                'name': p.name,
-                'state': p.state.value,
-                'priority': p.priority,
-                'cpu_usage': p.cpu_usage,
-                'running_time': int(time.time() - p.start_time),
-                'page_count': p.memory.page_count  # Include page_count here
-            }
-            for p in self.process_manager.get_all_processes()
-        ]
-
-    def schedule_processes(self):
-        while True:
-            processes = list(self.process_manager.get_all_processes())
-            running = [p for p in processes if p.state == ProcessState.RUNNING]
-            ready = [p for p in processes if p.state == ProcessState.READY]
-            # Sort by priority (higher number = higher priority)
-            ready.sort(key=lambda x: x.priority, reverse=True)
-
-            while len(running) > 3:     # Maximum concurrent running processes 3
-                running.pop().change_state(ProcessState.READY)
-
-            while len(running) < 3 and ready:
-                p = ready.pop(0)
-                p.change_state(ProcessState.RUNNING)
-                running.append(p)
-
-            time.sleep(1)       # Schedule every second
-
-
-class Process:
-    def __init__(self, pid, name, start_time):
-        self.pid = pid
-        self.name = name
-        self.start_time = start_time
-        self.status = "Running"
-
-
-class ProcessManager:
-    _instance = None
-    _next_pid = 1000
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ProcessManager, cls).__new__(cls)
-            cls._instance.processes = {}
-        return cls._instance
-
-    def create_process(self, name, priority, memory_manager):
-        pid = ProcessManager._next_pid
-        ProcessManager._next_pid += 1
-        process = DummyProcess(pid, name, priority, memory_manager)
-        self.processes[pid] = process
-        process.start()
-        return pid
-
-    def terminate_process(self, pid):
-        if pid in self.processes:
-            self.processes[pid].stop()
-            del self.processes[pid]
-            return True
-        return False
-
-    def get_all_processes(self):
-        return self.processes.values()
-
 
+from kernel import MetricsHistory, ProcessManager, ProcessScheduler, SimulationEngine
+import profiling
+from profiling import instrumented
 
 from datetime import datetime
 
@@ -566,7 +343,8 @@ class StartMenu(QFrame):
       #     ("Browser", "icons/browser.png"),
       #     ("Settings", "icons/settings.png"),
             ("Terminal", "terminal.png"),
-            ("Resource Monitor", "Resource-Monitor.png")
+            ("Resource Monitor", "Resource-Monitor.png"),
+            ("Performance", "Resource-Monitor.png")
         ]
 
         for app_name, icon_path in app_list:
@@ -626,6 +404,8 @@ class StartMenu(QFrame):
                 window = FileExplorer(desktop)
             elif app_name == "Resource Monitor":
                 window = ResourceMonitor(desktop)
+            elif app_name == "Performance":
+                window = PerformanceMonitor(desktop)
             else:
                 QMessageBox.information(self, "Launching App", f"Launching {app_name} (simulated).")
 
@@ -826,7 +606,7 @@ class Calculator(Window):
             self.content.deleteLater()
 
         self.current_equation = ""
-        self.pid = ProcessManager().create_process("Calculator",priority=1,memory_manager=MemoryManager())
+        self.pid = ProcessManager().create_process("Calculator", priority=1)
 
         # Create and set main layout
         main_content = QWidget()
@@ -898,14 +678,292 @@ class Calculator(Window):
         super().closeEvent(event)
 
 
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QObject, pyqtSignal
+from PyQt5.QtWidgets import QTableView, QStyledItemDelegate, QComboBox, QCheckBox
+from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import QPolygonF, QPen
+
+
+def format_percent(value):
+    return f"{value}%"
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+class ProcessTableModel(QAbstractTableModel):
+    # Table model fed with process snapshots (dicts as returned by
+    # ProcessScheduler.get_all_processes). update() diffs the new snapshot against the rows
+    # it holds and only signals the rows and cells that actually changed.
+    CPU_LOW = QColor("#6abe30")
+    CPU_MEDIUM = QColor("#e6b800")
+    CPU_HIGH = QColor("#d9534f")
+
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self.columns = columns  # [(header, snapshot key[, display format])]
+        self.keys = [column[1] for column in columns]
+        self.formats = [column[2] if len(column) > 2 else str for column in columns]
+        self.rows = []          # [(pid, (value per column))]
+        self.row_of = {}        # pid -> row index
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section][0]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        key = self.keys[index.column()]
+        value = self.rows[index.row()][1][index.column()]
+        if role == Qt.DisplayRole:
+            return self.formats[index.column()](value)
+        if role == Qt.UserRole:
+            return value
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignVCenter | Qt.AlignLeft if key == 'name' else Qt.AlignCenter
+        if role == Qt.ForegroundRole and key == 'cpu_usage':
+            if value < 30:
+                return self.CPU_LOW
+            if value < 70:
+                return self.CPU_MEDIUM
+            return self.CPU_HIGH
+        return None
+
+    def pid_at(self, row):
+        return self.rows[row][0]
+
+    def update(self, processes):
+        latest = {p['pid']: tuple(p[key] for key in self.keys) for p in processes}
+
+        # Removed processes, bottom up so row numbers stay valid while removing
+        removed = sorted((self.row_of[pid] for pid in self.row_of if pid not in latest), reverse=True)
+        for row in removed:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.rows[row]
+            self.endRemoveRows()
+        if removed:
+            self.row_of = {pid: row for row, (pid, _) in enumerate(self.rows)}
+
+        # Changed cells, one dataChanged per run of consecutive changed rows spanning their
+        # first to last changed column. Running times tick every refresh, so this keeps a
+        # refresh to a handful of signals instead of one per process
+        span = None  # [first row, last row, first column, last column]
+        for row, (pid, values) in enumerate(self.rows):
+            new_values = latest[pid]
+            if new_values == values:
+                continue
+            changed = [column for column, (old, new) in enumerate(zip(values, new_values)) if old != new]
+            self.rows[row] = (pid, new_values)
+            if span and span[1] == row - 1:
+                span[1] = row
+                span[2] = min(span[2], changed[0])
+                span[3] = max(span[3], changed[-1])
+            else:
+                if span:
+                    self.dataChanged.emit(self.index(span[0], span[2]), self.index(span[1], span[3]))
+                span = [row, row, changed[0], changed[-1]]
+        if span:
+            self.dataChanged.emit(self.index(span[0], span[2]), self.index(span[1], span[3]))
+
+        # New processes are appended
+        added = [pid for pid in latest if pid not in self.row_of]
+        if added:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            for pid in added:
+                self.row_of[pid] = len(self.rows)
+                self.rows.append((pid, latest[pid]))
+            self.endInsertRows()
+
+
+class MetricsSampler(QObject):
+    # One system-wide sampler for the monitor windows: a single timer takes one process
+    # snapshot per interval and hands the same sample to every consumer, instead of each
+    # window walking the process table on its own timer.
+    #
+    # Connect to `sampled` to get every frame, or subscribe(callback) to get backpressure:
+    # a subscriber whose callback takes longer than the interval skips the frames that
+    # arrive while it would still be busy instead of having them queue up.
+    sampled = pyqtSignal(object)
+    _instance = None
+    interval = 1000  # ms
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(MetricsSampler, cls).__new__(cls)
+            cls._instance.initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self.initialized:
+            return
+        super().__init__()
+        self.initialized = True
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.sample)
+        self.subscribers = []  # [callback, frames left to skip, frames dropped]
+        self.history = MetricsHistory()  # filled while the sampler runs
+        self.latest = None
+        self.frames = 0
+        self.sampling = False
+
+    @classmethod
+    def configure(cls, interval=None):
+        if interval is not None:
+            if interval <= 0:
+                raise ValueError("interval must be positive")
+            cls.interval = interval
+            if cls._instance is not None and cls._instance.timer.isActive():
+                cls._instance.timer.start(interval)
+
+    def subscribe(self, callback):
+        # The timer only runs while somebody listens
+        if not any(subscriber[0] == callback for subscriber in self.subscribers):
+            self.subscribers.append([callback, 0, 0])
+        if not self.timer.isActive():
+            self.timer.start(self.interval)
+
+    def unsubscribe(self, callback):
+        self.subscribers = [subscriber for subscriber in self.subscribers if subscriber[0] != callback]
+        if not self.subscribers:
+            self.timer.stop()
+
+    def dropped_frames(self, callback):
+        for subscriber in self.subscribers:
+            if subscriber[0] == callback:
+                return subscriber[2]
+        return 0
+
+    def take_sample(self):
+        # Builds a sample without publishing it, for on-demand refreshes
+        process_manager = ProcessManager()
+        memory = process_manager.memory_manager
+        engine = SimulationEngine()
+        return {
+            'tick': engine.current_tick,
+            'time': engine.clock.now(),
+            'processes': process_manager.snapshot(),
+            'memory': {
+                'total_pages': len(memory.pages),
+                'used_pages': memory.used_page_count(),
+                'page_faults': memory.page_faults
+            }
+        }
+
+    @instrumented()
+    def sample(self):
+        # A subscriber that spins the event loop could re-enter here, that frame is dropped
+        if self.sampling:
+            return None
+        self.sampling = True
+        try:
+            sample = self.take_sample()
+            self.latest = sample
+            self.history.record(sample)
+            self.frames += 1
+            self.sampled.emit(sample)
+            for subscriber in list(self.subscribers):
+                if subscriber[1] > 0:
+                    subscriber[1] -= 1
+                    subscriber[2] += 1
+                    continue
+                start = time.perf_counter()
+                subscriber[0](sample)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                subscriber[1] = int(elapsed_ms // self.interval)
+            return sample
+        finally:
+            self.sampling = False
+
+
+def paint_sparkline(painter, rect, values, maximum, color):
+    # Line graph of values scaled to [0, maximum], right aligned so the newest value is
+    # always at the right edge
+    if len(values) < 2 or rect.width() < 2:
+        return
+    maximum = max(maximum, max(values)) or 1
+    step = rect.width() / (len(values) - 1)
+    points = QPolygonF([
+        QPointF(rect.left() + i * step, rect.bottom() - value / maximum * rect.height())
+        for i, value in enumerate(values)
+    ])
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(QPen(QColor(color), 1.5))
+    painter.drawPolyline(points)
+
+
+class Sparkline(QWidget):
+    def __init__(self, color, maximum=100, parent=None):
+        super().__init__(parent)
+        self.color = color
+        self.maximum = maximum
+        self.values = []
+        self.setMinimumSize(120, 32)
+
+    def set_values(self, values):
+        self.values = values
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#1e1e1e"))
+        paint_sparkline(painter, self.rect().adjusted(2, 3, -2, -3), self.values, self.maximum, self.color)
+
+
+class SparklineDelegate(QStyledItemDelegate):
+    # Paints the CPU history of the row's process (the cell's Qt.UserRole value is the pid)
+    def __init__(self, history, color, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.color = color
+        self.step = 1
+        self.points = 60
+
+    def paint(self, painter, option, index):
+        # The cell's display text is empty, the base paint only draws the row background
+        super().paint(painter, option, index)
+        painter.save()
+        values = self.history.process_values(index.data(Qt.UserRole), 'cpu_usage', self.step, self.points)
+        paint_sparkline(painter, option.rect.adjusted(4, 4, -4, -4), values, 100, self.color)
+        painter.restore()
+
+
 class ResourceMonitor(Window):
+    # Ranges offered for the history graphs: (label, resolution step in seconds, points)
+    HISTORY_RANGES = [
+        ("Last minute", 1, 60),
+        ("Last 10 minutes", 10, 60),
+        ("Last hour", 60, 60)
+    ]
     def __init__(self, parent=None):
         super().__init__("Resource Monitor", width=800, height=450, parent=parent)
 
         # Process table
-        self.process_table = QTableWidget()
-        self.process_table.setColumnCount(6)
-        self.process_table.setHorizontalHeaderLabels(["PID", "Name", "State", "Priority", "CPU Usage", "Pages Used"])
+        self.process_model = ProcessTableModel([
+            ("PID", 'pid'),
+            ("Name", 'name'),
+            ("State", 'state'),
+            ("Priority", 'priority'),
+            ("CPU Usage", 'cpu_usage', format_percent),
+            ("Pages Used", 'page_count'),
+            ("CPU History", 'pid', lambda pid: "")
+        ])
+        self.process_table = QTableView()
+        self.process_table.setModel(self.process_model)
+        self.process_table.verticalHeader().hide()
+        self.sampler = MetricsSampler()
+        self.history_delegate = SparklineDelegate(self.sampler.history, "#4caf50", self.process_table)
+        self.process_table.setItemDelegateForColumn(6, self.history_delegate)
 
         # Header styling
         self.process_table.horizontalHeader().setStyleSheet("""
@@ -926,12 +984,13 @@ class ResourceMonitor(Window):
         self.process_table.setColumnWidth(3, 80)   # Priority
         self.process_table.setColumnWidth(4, 100)  # CPU Usage
         self.process_table.setColumnWidth(5, 100)  # Pages Used
+        self.process_table.setColumnWidth(6, 140)  # CPU History
         self.process_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)  # Name stretches
 
         # Style
         self.process_table.setAlternatingRowColors(True)
         self.process_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #1e1e1e;
                 color: white;
                 gridline-color: #444;
@@ -940,24 +999,24 @@ class ResourceMonitor(Window):
                 border: 1px solid #444;
                 border-radius: 6px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 6px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #0078d7;
                 color: white;
             }
-            QTableWidget::item:alternate {
+            QTableView::item:alternate {
                 background-color: #252525;
             }
         """)
-        self.process_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.process_table.setSelectionMode(QTableWidget.SingleSelection)
+        self.process_table.setSelectionBehavior(QTableView.SelectRows)
+        self.process_table.setSelectionMode(QTableView.SingleSelection)
         self.content_layout.addWidget(self.process_table)
 
         # Refresh button
         self.refresh_btn = QPushButton("Refresh")
-        self.refresh_btn.clicked.connect(self.update_process_list)
+        self.refresh_btn.clicked.connect(lambda: self.update_process_list())
         self.refresh_btn.setCursor(Qt.PointingHandCursor)
         self.refresh_btn.setFixedWidth(100)
         self.refresh_btn.setStyleSheet("""
@@ -977,74 +1036,103 @@ class ResourceMonitor(Window):
                 background-color: #003f6b;
             }
         """)
-        self.content_layout.addWidget(self.refresh_btn, alignment=Qt.AlignRight)
 
-        # Timer for periodic updates
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.update_process_list)
-        self.update_timer.start(1500)
+        # Memory summary for the shared address space
+        self.memory_label = QLabel()
+        self.memory_label.setStyleSheet("color: #ccc; font-size: 13px; border: none;")
+
+        # System-wide history graphs
+        self.cpu_graph = Sparkline("#4caf50")
+        self.memory_graph = Sparkline("#2196f3")
+        self.range_box = QComboBox()
+        self.range_box.addItems([label for label, _, _ in self.HISTORY_RANGES])
+        self.range_box.currentIndexChanged.connect(self.update_graphs)
+        history_layout = QHBoxLayout()
+        for label, graph in [("CPU", self.cpu_graph), ("Memory", self.memory_graph)]:
+            graph_label = QLabel(label)
+            graph_label.setStyleSheet("color: #ccc; font-size: 13px; border: none;")
+            history_layout.addWidget(graph_label)
+            history_layout.addWidget(graph, 1)
+        history_layout.addWidget(self.range_box)
+        self.content_layout.addLayout(history_layout)
+
+        bottom_layout = QHBoxLayout()
+        bottom_layout.addWidget(self.memory_label)
+        bottom_layout.addStretch()
+        bottom_layout.addWidget(self.refresh_btn)
+        self.content_layout.addLayout(bottom_layout)
 
-        self.pid = ProcessManager().create_process("Resource Monitor", priority=2, memory_manager=MemoryManager())
+        ProcessScheduler()  # starts scheduling and the background services on first use
+        self.pid = ProcessManager().create_process("Resource Monitor", priority=2)
+
+        # Periodic updates come from the shared sampler
+        self.sampler.subscribe(self.update_process_list)
 
         # Initial update
         self.update_process_list()
 
-    def update_process_list(self):
-        self.process_table.setRowCount(0)
-        processes = ProcessScheduler().get_all_processes()
-
-        for process in processes:
-            row = self.process_table.rowCount()
-            self.process_table.insertRow(row)
-
-            pid_item = QTableWidgetItem(str(process['pid']))
-            pid_item.setTextAlignment(Qt.AlignCenter)
-            self.process_table.setItem(row, 0, pid_item)
-
-            name_item = QTableWidgetItem(process['name'])
-            self.process_table.setItem(row, 1, name_item)
-
-            state_item = QTableWidgetItem(process['state'])
-            state_item.setTextAlignment(Qt.AlignCenter)
-            self.process_table.setItem(row, 2, state_item)
-
-            priority_item = QTableWidgetItem(str(process['priority']))
-            priority_item.setTextAlignment(Qt.AlignCenter)
-            self.process_table.setItem(row, 3, priority_item)
-
-            # CPU Usage
-            cpu_val = process['cpu_usage']
-            cpu_text = f"{cpu_val}%"
-            cpu_item = QTableWidgetItem(cpu_text)
-            cpu_item.setTextAlignment(Qt.AlignCenter)
-            if cpu_val < 30:
-                cpu_item.setForeground(QColor("#6abe30"))
-            elif cpu_val < 70:
-                cpu_item.setForeground(QColor("#e6b800"))
-            else:
-                cpu_item.setForeground(QColor("#d9534f"))
-            self.process_table.setItem(row, 4, cpu_item)
-
-            # Pages Used
-            pages_used = process['page_count']  # Ensure this is correctly retrieved
-            page_item = QTableWidgetItem(str(pages_used))
-            page_item.setTextAlignment(Qt.AlignCenter)
-            self.process_table.setItem(row, 5, page_item)
+    @instrumented()
+    def update_process_list(self, sample=None):
+        if sample is None:
+            sample = self.sampler.take_sample()
+        self.process_model.update(sample['processes'])
+
+        memory = sample['memory']
+        self.memory_label.setText(
+            f"Memory: {memory['used_pages']} / {memory['total_pages']} pages used, "
+            f"{memory['page_faults']} page faults"
+        )
+        self.update_graphs()
+
+    def update_graphs(self):
+        _, step, points = self.HISTORY_RANGES[self.range_box.currentIndex()]
+        history = self.sampler.history
+        self.cpu_graph.set_values(history.system_values('cpu_usage', step, points))
+        self.memory_graph.set_values(history.system_values('memory_percent', step, points))
+        # The history column shows the same pid every frame, so the model reports no change
+        self.history_delegate.step = step
+        self.history_delegate.points = points
+        self.process_table.viewport().update()
 
     def closeEvent(self, event):
         ProcessManager().terminate_process(self.pid)
-        self.update_timer.stop()
+        self.sampler.unsubscribe(self.update_process_list)
         super().closeEvent(event)
 
 
 
 from PyQt5.QtWidgets import (
-    QLabel, QPushButton, QHBoxLayout, QVBoxLayout, QProgressBar, QTableWidgetItem,
+    QLabel, QPushButton, QHBoxLayout, QVBoxLayout, QTableWidgetItem,
     QHeaderView, QTableWidget
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QRect
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle
 import time
-import random  # for mock CPU/memory usage
+
+
+class PercentBarDelegate(QStyledItemDelegate):
+    # Paints a percentage (the cell's Qt.UserRole value) as a progress bar, so the table
+    # needs no per-row QProgressBar widgets
+    TRACK_COLOR = QColor("#3a3a3a")
+    TEXT_COLOR = QColor("white")
+
+    def __init__(self, color, parent=None):
+        super().__init__(parent)
+        self.color = QColor(color)
+
+    def paint(self, painter, option, index):
+        value = index.data(Qt.UserRole) or 0
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        bar = option.rect.adjusted(4, 4, -4, -4)
+        painter.fillRect(bar, self.TRACK_COLOR)
+        filled = int(bar.width() * max(0, min(value, 100)) / 100)
+        painter.fillRect(QRect(bar.x(), bar.y(), filled, bar.height()), self.color)
+        painter.setPen(self.TEXT_COLOR)
+        painter.drawText(bar, Qt.AlignCenter, f"{value}%")
+        painter.restore()
+
 
 class TaskManager(Window):
     def __init__(self, parent=None):
@@ -1061,7 +1149,7 @@ class TaskManager(Window):
                 background-color: #202020;
                 color: white;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #2a2a2a;
                 border: none;
                 font-size: 12px;
@@ -1072,10 +1160,16 @@ class TaskManager(Window):
                 padding: 5px;
                 border: 1px solid #444;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #0078d7;
                 color: white;
             }
+            QLineEdit {
+                background-color: #2a2a2a;
+                border: 1px solid #444;
+                border-radius: 4px;
+                padding: 5px;
+            }
             QPushButton {
                 background-color: #3a3a3a;
                 color: white;
@@ -1098,15 +1192,42 @@ class TaskManager(Window):
         title_label.setObjectName("titleLabel")
         self.content_layout.addWidget(title_label)
 
-        # Process table
-        self.process_table = QTableWidget()
-        self.process_table.setColumnCount(6)
-        self.process_table.setHorizontalHeaderLabels([
-            "PID", "Name", "Status", "CPU %", "Memory %", "Time"
+        # Filter, matched against every column
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by name, state or PID...")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.content_layout.addWidget(self.filter_edit)
+
+        # Process table, the CPU and memory bars are painted by delegates. The proxy sorts on
+        # the raw values (Qt.UserRole) so numbers and times sort numerically
+        self.process_model = ProcessTableModel([
+            ("PID", 'pid'),
+            ("Name", 'name'),
+            ("Status", 'state'),
+            ("CPU %", 'cpu_usage'),
+            ("Memory %", 'mem_percent'),
+            ("Time", 'running_time', format_duration)
         ])
+        self.proxy_model = QSortFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.process_model)
+        self.proxy_model.setSortRole(Qt.UserRole)
+        self.proxy_model.setFilterKeyColumn(-1)
+        self.proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.proxy_model.setDynamicSortFilter(True)
+        self.filter_edit.textChanged.connect(self.proxy_model.setFilterFixedString)
+
+        self.process_table = QTableView()
+        self.process_table.setModel(self.proxy_model)
+        self.process_table.setSortingEnabled(True)
+        self.process_table.sortByColumn(0, Qt.AscendingOrder)
+        self.process_table.verticalHeader().hide()
+        self.cpu_delegate = PercentBarDelegate("#4caf50", self.process_table)
+        self.mem_delegate = PercentBarDelegate("#2196f3", self.process_table)
+        self.process_table.setItemDelegateForColumn(3, self.cpu_delegate)
+        self.process_table.setItemDelegateForColumn(4, self.mem_delegate)
         self.process_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.process_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.process_table.setSelectionMode(QTableWidget.SingleSelection)
+        self.process_table.setSelectionBehavior(QTableView.SelectRows)
+        self.process_table.setSelectionMode(QTableView.SingleSelection)
         self.content_layout.addWidget(self.process_table)
 
         # Buttons
@@ -1115,7 +1236,7 @@ class TaskManager(Window):
         buttons_layout.setContentsMargins(0, 10, 0, 0)
 
         self.refresh_btn = QPushButton("⟳ Refresh")
-        self.refresh_btn.clicked.connect(self.update_process_list)
+        self.refresh_btn.clicked.connect(lambda: self.update_process_list())
         buttons_layout.addWidget(self.refresh_btn)
 
         self.end_process_btn = QPushButton("✖ End Task")
@@ -1125,77 +1246,41 @@ class TaskManager(Window):
         self.content_layout.addLayout(buttons_layout)
 
         # Register Task Manager process
-        self.pid = ProcessManager().create_process("Task Manager",priority=3,memory_manager=MemoryManager())
+        self.pid = ProcessManager().create_process("Task Manager", priority=3)
 
-        # Timer
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.update_process_list)
-        self.update_timer.start(1000)
+        # Periodic updates come from the shared sampler
+        self.sampler = MetricsSampler()
+        self.sampler.subscribe(self.update_process_list)
 
-        self.process_table.itemSelectionChanged.connect(self.update_button_state)
+        self.process_table.selectionModel().selectionChanged.connect(self.update_button_state)
 
         self.update_process_list()
         self.update_button_state()
 
+    def selected_pid(self):
+        rows = self.process_table.selectionModel().selectedRows()
+        if rows:
+            return self.process_model.pid_at(self.proxy_model.mapToSource(rows[0]).row())
+        return None
+
     def update_button_state(self):
-        selected_items = self.process_table.selectedItems()
-        if selected_items:
-            pid = int(self.process_table.item(selected_items[0].row(), 0).text())
-            self.end_process_btn.setEnabled(pid != self.pid)
-        else:
-            self.end_process_btn.setEnabled(False)
-
-    def update_process_list(self):
-        self.process_table.setRowCount(0)
-        processes = sorted(ProcessManager().get_all_processes(), key=lambda p: p.pid)
-
-        for process in processes:
-            row = self.process_table.rowCount()
-            self.process_table.insertRow(row)
-
-            # PID
-            pid_item = QTableWidgetItem(str(process.pid))
-            pid_item.setTextAlignment(Qt.AlignCenter)
-            self.process_table.setItem(row, 0, pid_item)
-
-            # Name
-            name_item = QTableWidgetItem(process.name)
-            self.process_table.setItem(row, 1, name_item)
-
-            # Status
-            status_item = QTableWidgetItem(process.status)
-            status_item.setTextAlignment(Qt.AlignCenter)
-            self.process_table.setItem(row, 2, status_item)
-
-            # Simulated CPU % bar
-            cpu_percent = random.randint(1, 50)
-            cpu_bar = QProgressBar()
-            cpu_bar.setValue(cpu_percent)
-            cpu_bar.setStyleSheet("QProgressBar::chunk { background-color: #4caf50; }")
-            self.process_table.setCellWidget(row, 3, cpu_bar)
-
-            # Simulated Memory % bar
-            mem_percent = random.randint(1, 80)
-            mem_bar = QProgressBar()
-            mem_bar.setValue(mem_percent)
-            mem_bar.setStyleSheet("QProgressBar::chunk { background-color: #2196f3; }")
-            self.process_table.setCellWidget(row, 4, mem_bar)
-
-            # Time
-            running_time = int(time.time() - process.start_time)
-            minutes = running_time // 60
-            seconds = running_time % 60
-            time_str = f"{minutes:02d}:{seconds:02d}"
-            time_item = QTableWidgetItem(time_str)
-            time_item.setTextAlignment(Qt.AlignCenter)
-            self.process_table.setItem(row, 5, time_item)
+        pid = self.selected_pid()
+        self.end_process_btn.setEnabled(pid is not None and pid != self.pid)
+
+    @instrumented()
+    def update_process_list(self, sample=None):
+        if sample is None:
+            sample = self.sampler.take_sample()
+        total_pages = sample['memory']['total_pages'] or 1
+        # Snapshot rows are shared with other readers, extend copies of them
+        self.process_model.update([
+            dict(process, mem_percent=round(process['page_count'] * 100 / total_pages))
+            for process in sample['processes']
+        ])
 
     def end_selected_process(self):
-        selected_items = self.process_table.selectedItems()
-        if selected_items:
-            row = selected_items[0].row()
-            pid = int(self.process_table.item(row, 0).text())
-
+        pid = self.selected_pid()
+        if pid is not None:
             if pid == self.pid:
                 return
 
@@ -1209,7 +1294,141 @@ class TaskManager(Window):
             self.update_button_state()
 
     def closeEvent(self, event):
-        self.update_timer.stop()
+        self.sampler.unsubscribe(self.update_process_list)
+        ProcessManager().terminate_process(self.pid)
+        super().closeEvent(event)
+
+
+class PerformanceMonitor(Window):
+    # Timings recorded by the profiling module, slowest operations first, plus on-demand
+    # cProfile dumps of the UI thread
+    SORT_KEYS = [("Slowest call", 'max'), ("Total time", 'total'), ("Average", 'average')]
+
+    def __init__(self, parent=None):
+        super().__init__("Performance", width=700, height=420, parent=parent)
+        self.setStyleSheet(self.styleSheet() + """
+            QTableWidget {
+                background-color: #1e1e1e;
+                color: white;
+                gridline-color: #444;
+                font-size: 12px;
+                border: 1px solid #444;
+            }
+            QHeaderView::section {
+                background-color: #383838;
+                color: white;
+                padding: 4px;
+                border: 1px solid #444;
+            }
+            QCheckBox, QLabel {
+                color: #ccc;
+                font-size: 13px;
+                border: none;
+            }
+        """)
+
+        controls = QHBoxLayout()
+        self.record_box = QCheckBox("Record timings")
+        self.record_box.setChecked(profiling.enabled)
+        self.record_box.toggled.connect(self.toggle_recording)
+        controls.addWidget(self.record_box)
+        self.sort_box = QComboBox()
+        self.sort_box.addItems([label for label, _ in self.SORT_KEYS])
+        self.sort_box.currentIndexChanged.connect(lambda: self.update_report())
+        controls.addWidget(self.sort_box)
+        controls.addStretch()
+        self.reset_btn = self.create_button("Reset", self.reset_report)
+        controls.addWidget(self.reset_btn)
+        self.profile_btn = self.create_button("Start profiling", self.toggle_profile)
+        controls.addWidget(self.profile_btn)
+        self.content_layout.addLayout(controls)
+
+        self.report_table = QTableWidget(0, 6)
+        self.report_table.setHorizontalHeaderLabels(["Operation", "Thread", "Calls", "Avg ms", "Max ms", "Total ms"])
+        self.report_table.verticalHeader().hide()
+        self.report_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.report_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.report_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.content_layout.addWidget(self.report_table)
+
+        self.status_label = QLabel()
+        self.content_layout.addWidget(self.status_label)
+
+        # Own timer: the shared sampler would take a process snapshot and record history
+        # every second just to refresh this table, and show up in it
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update_report)
+        self.timer.start(1000)
+        self.update_report()
+
+        # Register process
+        self.pid = ProcessManager().create_process("Performance Monitor", priority=2)
+
+    def create_button(self, text, callback):
+        button = QPushButton(text)
+        button.setStyleSheet("""
+            QPushButton {
+                background-color: #3a3a3a;
+                font-size: 12px;
+                font-weight: normal;
+                padding: 5px 12px;
+                border-radius: 4px;
+            }
+            QPushButton:hover {
+                background-color: #0078d7;
+            }
+        """)
+        button.clicked.connect(callback)
+        return button
+
+    def toggle_recording(self, checked):
+        if checked:
+            profiling.enable()
+        else:
+            profiling.disable()
+        self.update_report()
+
+    def reset_report(self):
+        profiling.reset()
+        self.update_report()
+
+    def toggle_profile(self):
+        if not profiling.is_profiling():
+            profiling.start_profile()
+            self.profile_btn.setText("Stop && save profile")
+            self.status_label.setText("Profiling the UI thread...")
+            return
+        default_name = f"pyos-{datetime.now().strftime('%Y%m%d-%H%M%S')}.prof"
+        path, _ = QFileDialog.getSaveFileName(self, "Save Profile", default_name, "cProfile dumps (*.prof)")
+        self.profile_btn.setText("Start profiling")
+        if path:
+            profiling.stop_profile(path)
+            self.status_label.setText(f"Profile saved to {path}")
+        else:
+            profiling.stop_profile(os.devnull)
+            self.status_label.setText("Profile discarded")
+
+    def update_report(self):
+        _, sort = self.SORT_KEYS[self.sort_box.currentIndex()]
+        rows = profiling.report(sort)
+        self.report_table.setRowCount(len(rows))
+        for row, stats in enumerate(rows):
+            values = [
+                stats.name, stats.thread, str(stats.calls), f"{stats.average * 1000:.2f}",
+                f"{stats.max * 1000:.2f}", f"{stats.total * 1000:.1f}"
+            ]
+            for column, value in enumerate(values):
+                item = self.report_table.item(row, column)
+                if item is None:
+                    self.report_table.setItem(row, column, QTableWidgetItem(value))
+                else:
+                    item.setText(value)
+        if not profiling.is_profiling():
+            state = "on" if profiling.enabled else "off"
+            self.status_label.setText(f"Recording {state}, {len(rows)} operations")
+
+    def closeEvent(self, event):
+        self.timer.stop()
         ProcessManager().terminate_process(self.pid)
         super().closeEvent(event)
 
@@ -1295,7 +1514,7 @@ class Notepad(Window):
 
         self.current_file = None
 
-        self.pid = ProcessManager().create_process("Notepad",priority=1,memory_manager=MemoryManager())
+        self.pid = ProcessManager().create_process("Notepad", priority=1)
 
     def new_file(self):
         if self.maybe_save():
@@ -1402,15 +1621,36 @@ class Notepad(Window):
 
 
 
+import codecs
+import locale
+from collections import deque
+from PyQt5.QtCore import QProcess, QEvent
+from PyQt5.QtWidgets import QPlainTextEdit
+from shell import CommandHistory, PathCompleter, ShellContext, ShellError, build_pipeline
+
+
 class Terminal(Window):
+    # Lines kept in the output before the oldest are dropped, and how long writes are
+    # collected before they are drawn in one go (ms)
+    scrollback_lines = 10000
+    flush_interval = 16
+    # Lines a built-in command may print, and how long it may run (ms), per event loop turn
+    builtin_page_lines = 500
+    builtin_page_time = 10
+    # Commands typed in any terminal, appended as they run and read on first use
+    history_file = os.path.join(os.path.expanduser("~"), ".pyos_history")
+
     def __init__(self, parent=None):
         super().__init__("Terminal", width=700, height=450, parent=parent)
 
-        # Terminal output (read-only, multiline)
-        self.terminal_output = QTextEdit()
+        # Terminal output (read-only, multiline). A plain text document with a block limit
+        # keeps appends cheap and memory bounded however much a command prints
+        self.terminal_output = QPlainTextEdit()
         self.terminal_output.setReadOnly(True)
+        self.terminal_output.setUndoRedoEnabled(False)
+        self.terminal_output.setMaximumBlockCount(self.scrollback_lines)
         self.terminal_output.setStyleSheet("""
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #1e1e1e;
                 color: #00ff00;
                 font-family: 'Consolas', 'Courier New', monospace;
@@ -1421,6 +1661,13 @@ class Terminal(Window):
         """)
         self.content_layout.addWidget(self.terminal_output)
 
+        # Lines written since the last flush; older ones fall off once it holds a full
+        # scrollback, they would be dropped from the document anyway
+        self.pending_output = deque(maxlen=self.scrollback_lines)
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.timeout.connect(self.flush_output)
+
         # Command input (single-line)
         self.command_input = QLineEdit()
         self.command_input.setStyleSheet("""
@@ -1437,11 +1684,54 @@ class Terminal(Window):
             }
         """)
         self.command_input.returnPressed.connect(self.execute_command)
+        self.command_input.textEdited.connect(self.input_edited)
+        # Ctrl+C interrupts the running command instead of copying; Up/Down, Ctrl+R and
+        # Tab go to the history and completion instead of moving the focus
+        self.command_input.installEventFilter(self)
+
+        # Reverse search status, shown above the input while Ctrl+R is active
+        self.search_label = QLabel()
+        self.search_label.setStyleSheet("""
+            QLabel {
+                background-color: #1e1e1e;
+                color: #c8c8c8;
+                font-family: 'Consolas', 'Courier New', monospace;
+                font-size: 13px;
+                padding: 2px 8px;
+            }
+        """)
+        self.search_label.hide()
+        self.content_layout.addWidget(self.search_label)
         self.content_layout.addWidget(self.command_input)
 
+        # Command history shared by all terminals, and path completion for Tab
+        self.history = CommandHistory.open(self.history_file)
+        self.history_matches = None  # commands Up/Down step through, most recent first
+        self.history_position = -1
+        self.history_typed = ""      # the input before Up was pressed
+        self.search_active = False
+        self.search_matches = []
+        self.search_position = 0
+        self.search_saved = ""
+        self.completer = PathCompleter()
+
         # Set initial current directory to user's home folder (more Windows-like)
         # Set initial current directory to actual location
         self.current_dir = r"C:\Users\anasa\OneDrive\Desktop\GBS\Py-OS\My PC"
+        if not os.path.isdir(self.current_dir):
+            # Same folder the File Explorer opens
+            self.current_dir = os.path.join(os.getcwd(), "My PC")
+            os.makedirs(self.current_dir, exist_ok=True)
+
+        # Built-in command currently printing, drawn a page of lines per event loop turn
+        self.builtin_output = None
+        self.builtin_timer = QTimer(self)
+        self.builtin_timer.timeout.connect(self.pump_builtin)
+
+        # External command currently running, its output is streamed as it arrives
+        self.job = None
+        self.job_decoders = {}  # channel -> incremental decoder
+        self.job_partial = {}   # channel -> text after the last newline
 
         # Set display name (e.g., to mimic 'C:' instead of long path)
         self.display_name = "C:"
@@ -1451,20 +1741,63 @@ class Terminal(Window):
         self.display_prompt()
 
         # Register process
-        self.pid = ProcessManager().create_process("Terminal",priority=3,memory_manager=MemoryManager())
+        self.pid = ProcessManager().create_process("Terminal", priority=3)
+
+    @classmethod
+    def configure(cls, scrollback_lines=None, flush_interval=None, history_file=None):
+        # Applies to terminals opened afterwards
+        if scrollback_lines is not None:
+            if scrollback_lines < 1:
+                raise ValueError("scrollback_lines must be at least 1")
+            cls.scrollback_lines = scrollback_lines
+        if flush_interval is not None:
+            cls.flush_interval = flush_interval
+        if history_file is not None:
+            cls.history_file = history_file
 
     def write_output(self, text):
-        self.terminal_output.append(text)
-        # Auto-scroll to bottom after new output
+        # Batched: everything written within one flush interval is drawn together
+        self.pending_output.extend(text.split("\n"))
+        if not self.flush_timer.isActive():
+            self.flush_timer.start(self.flush_interval)
+
+    def flush_output(self):
+        self.flush_timer.stop()
+        if not self.pending_output:
+            return
         scrollbar = self.terminal_output.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        # Only follow the output if the view was already at the bottom
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        self.terminal_output.appendPlainText("\n".join(self.pending_output))
+        self.pending_output.clear()
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def clear_output(self):
+        self.pending_output.clear()
+        self.terminal_output.clear()
 
     def display_prompt(self):
         prompt_text = f"{self.display_name}> "
         self.write_output(prompt_text)
         self.command_input.setFocus()
 
+    @instrumented()
     def execute_command(self):
+        if self.search_active:
+            self.finish_search(accept=True)
+        self.history_matches = None
+        if self.builtin_output is not None:
+            return  # a built-in command is still printing, Ctrl+C stops it
+
+        if self.job is not None:
+            # Input for the running command, sent as typed (an empty line too)
+            text = self.command_input.text()
+            self.write_output(text)
+            self.job.write((text + "\n").encode(locale.getpreferredencoding(False), errors='replace'))
+            self.command_input.clear()
+            return
+
         command = self.command_input.text().strip()
         if not command:
             self.display_prompt()
@@ -1472,8 +1805,8 @@ class Terminal(Window):
             return
 
         # Echo the command input in output window (like real terminals do)
-        folder_name = os.path.basename(self.current_dir) or self.current_dir
         self.write_output(f"{self.display_name}> {command}")
+        self.history.add(command)
 
         self.command_input.clear()
 
@@ -1496,53 +1829,276 @@ class Terminal(Window):
                 else:
                     self.write_output(f"System cannot find the path specified: {new_dir}")
 
-            elif command in ["dir", "ls"]:
-                # List directory contents with details like Windows 'dir'
-                try:
-                    entries = os.listdir(self.current_dir)
-                    entries.sort()
-                    output_lines = []
-                    for e in entries:
-                        full_path = os.path.join(self.current_dir, e)
-                        if os.path.isdir(full_path):
-                            output_lines.append(f"<DIR>       {e}")
-                        else:
-                            size = os.path.getsize(full_path)
-                            output_lines.append(f"          {size:>10} {e}")
-                    self.write_output("\n".join(output_lines))
-                except Exception as e:
-                    self.write_output(f"Error listing directory: {e}")
 
             elif command == "cls":
                 # Clear screen command
-                self.terminal_output.clear()
+                self.clear_output()
 
             elif command == "pwd":
                 self.write_output(self.current_dir)
 
             else:
-                # Execute other commands via subprocess for safety and output capture
-                import subprocess
-                process = subprocess.Popen(
-                    command,
-                    shell=True,
-                    cwd=self.current_dir,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-                stdout, stderr = process.communicate()
-                if stdout:
-                    self.write_output(stdout.strip())
-                if stderr:
-                    self.write_output(stderr.strip())
+                # Built-ins and pipelines of them run in-process (see shell.py)
+                pipeline = build_pipeline(command, ShellContext(self.current_dir, self.kill_process))
+                if pipeline is not None:
+                    self.run_builtin(pipeline)
+                    return
+                # Other commands run in the system shell without blocking the desktop,
+                # the prompt comes back when the command finishes
+                self.start_job(command)
+                return
 
+        except ShellError as e:
+            self.write_output(str(e))
         except Exception as e:
             self.write_output(f"Error: {str(e)}")
 
         self.display_prompt()
 
+    def run_builtin(self, lines):
+        self.builtin_output = iter(lines)
+        self.pump_builtin()
+        if self.builtin_output is not None:
+            self.builtin_timer.start(0)
+
+    def pump_builtin(self):
+        # Stops after a page of lines or the time budget, whichever comes first; commands
+        # working without output yield None so the budget is checked in between
+        page = []
+        finished = False
+        deadline = time.perf_counter() + self.builtin_page_time / 1000
+        try:
+            for line in self.builtin_output:
+                if line is not None:
+                    page.append(line)
+                if len(page) >= self.builtin_page_lines or time.perf_counter() >= deadline:
+                    break
+            else:
+                finished = True
+        except ShellError as e:
+            page.append(str(e))
+            finished = True
+        except OSError as e:
+            page.append(f"Error: {e.strerror or e}")
+            finished = True
+        except Exception as e:
+            page.append(f"Error: {e}")
+            finished = True
+        if page:
+            self.write_output("\n".join(page))
+        if finished:
+            self.stop_builtin()
+
+    def stop_builtin(self):
+        self.builtin_timer.stop()
+        if self.builtin_output is not None:
+            if hasattr(self.builtin_output, 'close'):
+                self.builtin_output.close()
+            self.builtin_output = None
+            self.display_prompt()
+
+    def kill_process(self, pid):
+        # kill built-in: like End Task in the Task Manager, a window owning the process
+        # is closed along with it
+        if pid not in ProcessManager().processes:
+            return False
+        if self.parent() is not None:
+            for window in self.parent().findChildren(Window):
+                if getattr(window, 'pid', None) == pid and window is not self:
+                    window.close()
+                    break
+        ProcessManager().terminate_process(pid)
+        return True
+
+    def start_job(self, command):
+        job = QProcess(self)
+        job.setWorkingDirectory(self.current_dir)
+        if os.name == "nt":
+            job.setProgram("cmd.exe")
+            job.setNativeArguments(f"/c {command}")
+        else:
+            job.setProgram("/bin/sh")
+            job.setArguments(["-c", command])
+        encoding = locale.getpreferredencoding(False)
+        self.job_decoders = {
+            channel: codecs.getincrementaldecoder(encoding)(errors='replace')
+            for channel in (QProcess.StandardOutput, QProcess.StandardError)
+        }
+        self.job_partial = {QProcess.StandardOutput: "", QProcess.StandardError: ""}
+        job.readyReadStandardOutput.connect(lambda: self.read_job_output(job, QProcess.StandardOutput))
+        job.readyReadStandardError.connect(lambda: self.read_job_output(job, QProcess.StandardError))
+        job.finished.connect(lambda exit_code, exit_status: self.job_finished(job, exit_code, exit_status))
+        job.errorOccurred.connect(lambda error: self.job_error(job, error))
+        self.job = job
+        job.start()
+
+    def read_job_output(self, job, channel):
+        if channel == QProcess.StandardOutput:
+            data = bytes(job.readAllStandardOutput())
+        else:
+            data = bytes(job.readAllStandardError())
+        self.write_job_text(channel, self.job_decoders[channel].decode(data))
+
+    def write_job_text(self, channel, text, final=False):
+        # Complete lines are written right away, a partial line waits for its newline
+        text = self.job_partial[channel] + text.replace("\r\n", "\n")
+        lines = text.split("\n")
+        self.job_partial[channel] = "" if final else lines.pop()
+        if final and lines and lines[-1] == "":
+            lines.pop()
+        if lines:
+            self.write_output("\n".join(lines))
+
+    def job_finished(self, job, exit_code, exit_status):
+        if job is not self.job:
+            return
+        self.read_job_output(job, QProcess.StandardOutput)
+        self.read_job_output(job, QProcess.StandardError)
+        for channel in (QProcess.StandardOutput, QProcess.StandardError):
+            self.write_job_text(channel, self.job_decoders[channel].decode(b"", final=True), final=True)
+        self.job = None
+        job.deleteLater()
+        self.display_prompt()
+
+    def job_error(self, job, error):
+        if job is self.job and error == QProcess.FailedToStart:
+            self.write_output(f"Could not start the command: {job.errorString()}")
+            self.job = None
+            job.deleteLater()
+            self.display_prompt()
+
+    def interrupt_job(self):
+        if self.job is None:
+            return
+        self.write_output("^C")
+        job = self.job
+        job.terminate()
+        # Commands ignoring the request are killed after a grace period
+        QTimer.singleShot(1000, lambda: job.kill() if self.job is job else None)
+
+    def input_edited(self, text):
+        # Typing ends Up/Down navigation; during a reverse search it is the query
+        self.history_matches = None
+        if self.search_active:
+            self.search_matches = self.history.matches(text) if text else []
+            self.search_position = 0
+            self.show_search()
+
+    def history_step(self, step):
+        # step 1 is an older command, -1 a newer one. Only commands starting with what
+        # was typed before the first Up are offered
+        if self.history_matches is None:
+            self.history_typed = self.command_input.text()
+            self.history_matches = self.history.matches(self.history_typed)
+            self.history_position = -1
+        position = self.history_position + step
+        if position < -1 or position >= len(self.history_matches):
+            return
+        self.history_position = position
+        self.command_input.setText(self.history_typed if position == -1 else self.history_matches[position])
+
+    def start_search(self):
+        if self.search_active:
+            # Ctrl+R again: the next older match
+            if self.search_position + 1 < len(self.search_matches):
+                self.search_position += 1
+            self.show_search()
+            return
+        self.search_active = True
+        self.search_saved = self.command_input.text()
+        self.history_matches = None
+        self.command_input.clear()
+        self.search_matches = []
+        self.search_position = 0
+        self.show_search()
+        self.search_label.show()
+
+    def search_match(self):
+        if self.search_position < len(self.search_matches):
+            return self.search_matches[self.search_position]
+        return None
+
+    def show_search(self):
+        query = self.command_input.text()
+        match = self.search_match()
+        if match is None and query:
+            self.search_label.setText(f"(failed reverse-i-search)`{query}'")
+        else:
+            self.search_label.setText(f"(reverse-i-search)`{query}': {match or ''}")
+
+    def finish_search(self, accept):
+        # Accepting puts the match in the input, cancelling restores what was there
+        match = self.search_match()
+        self.search_active = False
+        self.search_label.hide()
+        if accept:
+            if match is not None:
+                self.command_input.setText(match)
+        else:
+            self.command_input.setText(self.search_saved)
+
+    def complete_path(self):
+        # Completes the word before the cursor as a path relative to the current folder
+        text = self.command_input.text()
+        cursor = self.command_input.cursorPosition()
+        head = text[:cursor]
+        start = max(head.rfind(" "), head.rfind("\t")) + 1
+        word = head[start:]
+        quote = word[:1] if word[:1] in ("\"", "'") else ""
+        completed, candidates = self.completer.complete(self.current_dir, word[len(quote):])
+        if candidates and completed == word[len(quote):]:
+            # Nothing more in common, list the choices like a shell does
+            self.write_output("  ".join(candidates))
+            return
+        if not quote and " " in completed:
+            quote = "\""
+        completed = quote + completed
+        if quote and not candidates and not completed.endswith(os.sep):
+            completed += quote
+        self.command_input.setText(head[:start] + completed + text[cursor:])
+        self.command_input.setCursorPosition(start + len(completed))
+
+    def eventFilter(self, watched, event):
+        if watched is not self.command_input or event.type() != QEvent.KeyPress:
+            return super().eventFilter(watched, event)
+        key = event.key()
+        control = event.modifiers() & Qt.ControlModifier
+        if key == Qt.Key_C and control and not self.command_input.hasSelectedText():
+            if self.search_active:
+                self.finish_search(accept=False)
+            if self.builtin_output is not None:
+                self.write_output("^C")
+                self.stop_builtin()
+            elif self.job is not None:
+                self.interrupt_job()
+            else:
+                self.command_input.clear()
+            return True
+        if self.job is not None:
+            return super().eventFilter(watched, event)  # keys go to the command's input
+        if key == Qt.Key_R and control:
+            self.start_search()
+            return True
+        if self.search_active and (key == Qt.Key_Escape or (key == Qt.Key_G and control)):
+            self.finish_search(accept=False)
+            return True
+        if self.search_active and key in (Qt.Key_Up, Qt.Key_Down, Qt.Key_Left, Qt.Key_Right, Qt.Key_Tab):
+            # Leaves the search with the match in the input, ready to edit
+            self.finish_search(accept=True)
+            return True
+        if key in (Qt.Key_Up, Qt.Key_Down):
+            self.history_step(1 if key == Qt.Key_Up else -1)
+            return True
+        if key == Qt.Key_Tab:
+            self.complete_path()
+            return True
+        return super().eventFilter(watched, event)
+
     def closeEvent(self, event):
+        self.builtin_timer.stop()
+        if self.job is not None:
+            self.job.kill()
+            self.job.waitForFinished(1000)
         ProcessManager().terminate_process(self.pid)
         super().closeEvent(event)
 
@@ -1619,7 +2175,7 @@ class FileExplorer(Window):
         self.file_list.doubleClicked.connect(self.item_double_clicked)
         self.content_layout.addWidget(self.file_list)
 
-        self.pid = ProcessManager().create_process("File Explorer",priority=2,memory_manager=MemoryManager())
+        self.pid = ProcessManager().create_process("File Explorer", priority=2)
         self.update_view()
 
     def create_nav_btn(self, label, action):
@@ -1641,6 +2197,7 @@ class FileExplorer(Window):
         """)
         return btn
 
+    @instrumented()
     def update_view(self):
         self.path_input.setText(self.pretty_path(self.current_path))
         self.file_list.setRowCount(0)
@@ -1746,7 +2303,19 @@ class FileExplorer(Window):
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    # Options of our own; everything else is left to Qt (-style, -platform, ...)
+    parser = argparse.ArgumentParser(description="Py-OS desktop")
+    parser.add_argument("--profile", action="store_true", help="record hot-path timings from the start")
+    parser.add_argument("--export-port", type=int, metavar="PORT",
+                        help="serve live metrics on this port, see exporter.py")
+    args, qt_args = parser.parse_known_args()
+    app = QApplication(sys.argv[:1] + qt_args)
+    if args.profile:
+        profiling.enable()
+    if args.export_port is not None:
+        # Live scheduler and memory metrics for Prometheus or curl, see exporter.py
+        from exporter import MetricsExporter
+        exporter = MetricsExporter(args.export_port).start()
     desktop_window = DesktopWindow()
     desktop_window.show()
     #desktop_window.showFullScreen()
@@ -0,0 +1,51 @@
+# Runs one batch workload on 1 to 128 simulated cores and prints completion time,
+# average turnaround, work steals, migrations and load imbalance.
+#
+#   python benchmarks/core_scaling.py [policy]
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kernel import ProcessManager, ProcessScheduler, SimulationClock, SimulationEngine, reset_simulation
+
+CORE_COUNTS = [1, 2, 4, 8, 16, 32, 64, 128]
+JOBS = 4000
+MAX_TICKS = 100_000
+
+
+def run(cores, policy):
+    reset_simulation()
+    # Same seed for every run, so blocking and wake-up rolls are identical
+    SimulationClock.configure(mode="fast", seed=1)
+
+    engine = SimulationEngine()
+    engine.auto_start = False
+    ProcessManager.configure_memory(total_pages=JOBS * 8)
+    ProcessScheduler.configure(policy, cpu_cores=cores, background_services=False)
+    scheduler = ProcessScheduler()
+    process_manager = ProcessManager()
+
+    rng = random.Random(0)
+    for _ in range(JOBS):
+        process_manager.create_process("job", rng.randint(1, 3), burst=rng.randint(1, 30))
+    while process_manager.processes and engine.current_tick < MAX_TICKS:
+        engine.tick()
+    return scheduler.stats()
+
+
+def main():
+    policy = sys.argv[1] if len(sys.argv) > 1 else "rr"
+    print(f"{'Cores':>5} {'Ticks':>7} {'Turnaround':>11} {'Steals':>7} {'Migrations':>11} {'Imbalance':>10} {'Util min/max':>13}")
+    for cores in CORE_COUNTS:
+        stats = run(cores, policy)
+        utilization = stats['core_utilization']
+        print(f"{cores:>5} {stats['ticks']:>7} {stats['avg_turnaround']:>11.1f} {stats['steals']:>7} "
+              f"{stats['migrations']:>11} {stats['load_imbalance']:>10.2f} "
+              f"{min(utilization):>6.2f}/{max(utilization):.2f}")
+
+
+if __name__ == "__main__":
+    main()
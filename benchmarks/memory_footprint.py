@@ -0,0 +1,50 @@
+# Compares the memory footprint of the old one-object-per-page layout with the
+# array-backed PageTable used by MemoryManager.
+#
+#   python benchmarks/memory_footprint.py
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kernel import MemoryManager
+
+PAGE_COUNTS = [10_000, 100_000, 1_000_000]
+
+
+class LegacyMemoryPage:
+    # The per-page object MemoryManager used before the page table
+    def __init__(self):
+        self.is_used = False
+        self.process_id = None
+        self.last_used = time.time()
+
+
+def measure(build):
+    tracemalloc.start()
+    obj = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return current
+
+
+def format_bytes(size):
+    if size > 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    return f"{size / 1024:.1f} KB"
+
+
+def main():
+    print(f"{'Pages':>10} {'Objects':>12} {'PageTable':>12} {'Ratio':>8}")
+    for count in PAGE_COUNTS:
+        legacy = measure(lambda: [LegacyMemoryPage() for _ in range(count)])
+        compact = measure(lambda: MemoryManager(count))
+        print(f"{count:>10} {format_bytes(legacy):>12} {format_bytes(compact):>12} {legacy / compact:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Ticks per second of the process simulator for the object-based SimulationEngine
+# and the NumPy VectorizedSimulation backend.
+#
+#   python benchmarks/process_tick_rate.py [--skip-python-1m]
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kernel import DummyProcess, MemoryManager, SimulationClock, SimulationEngine, VectorizedSimulation, \
+    reset_simulation
+
+PROCESS_COUNTS = [1_000, 100_000, 1_000_000]
+TIME_BUDGET = 3.0  # seconds spent ticking per measurement
+MAX_TICKS = 1000
+WARMUP_TICKS = 20  # let the state distribution settle before measuring
+
+
+def measure_ticks(tick):
+    for _ in range(WARMUP_TICKS):
+        tick()
+    ticks = 0
+    start = time.perf_counter()
+    while ticks < MAX_TICKS:
+        tick()
+        ticks += 1
+        if time.perf_counter() - start > TIME_BUDGET:
+            break
+    return ticks / (time.perf_counter() - start)
+
+
+def python_backend(count):
+    reset_simulation()
+    SimulationClock.configure(mode="fast", seed=0)
+    engine = SimulationEngine()
+    engine.auto_start = False
+    # No pages: the benchmark measures the state machine, not the memory manager
+    memory_manager = MemoryManager(0)
+    for pid in range(count):
+        engine.add_process(DummyProcess(pid, "bench", random.randint(1, 3), memory_manager))
+    return measure_ticks(engine.tick)
+
+
+def vectorized_backend(count):
+    simulation = VectorizedSimulation(count, seed=0)
+    rng = random.Random(0)
+    simulation.add_processes([rng.randint(1, 3) for _ in range(count)])
+    return measure_ticks(simulation.tick)
+
+
+def main():
+    skip_python_1m = "--skip-python-1m" in sys.argv
+    random.seed(0)
+    print(f"{'Processes':>10} {'Python ticks/s':>16} {'NumPy ticks/s':>15}")
+    for count in PROCESS_COUNTS:
+        if skip_python_1m and count >= 1_000_000:
+            python_rate = "-"
+        else:
+            python_rate = f"{python_backend(count):.1f}"
+        numpy_rate = f"{vectorized_backend(count):.1f}"
+        print(f"{count:>10} {python_rate:>16} {numpy_rate:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Runs the same batch workload under every scheduling policy and prints throughput,
+# average turnaround, average waiting time and context switches (all in engine ticks).
+#
+#   python benchmarks/scheduling_policies.py
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kernel import (
+    SCHEDULING_POLICIES,
+    ProcessManager,
+    ProcessScheduler,
+    SimulationClock,
+    SimulationEngine,
+    reset_simulation
+)
+
+JOBS = 500
+ARRIVAL_TICKS = 1500  # jobs arrive evenly over this many ticks
+MAX_TICKS = 20_000
+CPU_CORES = 3
+
+
+def make_workload(seed=0):
+    rng = random.Random(seed)
+    return [
+        (i * ARRIVAL_TICKS // JOBS, rng.randint(1, 3), rng.randint(1, 30))
+        for i in range(JOBS)
+    ]
+
+
+def run_policy(policy, workload):
+    reset_simulation()
+    # Same seed for every run, so blocking and wake-up rolls are identical
+    SimulationClock.configure(mode="fast", seed=1)
+
+    engine = SimulationEngine()
+    engine.auto_start = False
+    ProcessManager.configure_memory(total_pages=JOBS * 8)
+    ProcessScheduler.configure(policy, cpu_cores=CPU_CORES, background_services=False)
+    scheduler = ProcessScheduler()
+    process_manager = ProcessManager()
+
+    pending = list(workload)
+    while (pending or process_manager.processes) and engine.current_tick < MAX_TICKS:
+        while pending and pending[0][0] <= engine.current_tick:
+            _, priority, burst = pending.pop(0)
+            process_manager.create_process("job", priority, burst=burst)
+        engine.tick()
+    return scheduler.stats()
+
+
+def main():
+    workload = make_workload()
+    print(f"{'Policy':<12} {'Done':>6} {'Thrpt/tick':>10} {'Turnaround':>11} {'Waiting':>9} {'Switches':>9}")
+    for name in SCHEDULING_POLICIES:
+        stats = run_policy(name, workload)
+        print(f"{stats['policy']:<12} {stats['completed']:>6} {stats['throughput']:>10.3f} "
+              f"{stats['avg_turnaround']:>11.1f} {stats['avg_waiting']:>9.1f} {stats['context_switches']:>9}")
+
+
+if __name__ == "__main__":
+    main()
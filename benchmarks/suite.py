@@ -0,0 +1,281 @@
+# Reproducible benchmark suite for the memory manager, the scheduler, process churn and
+# the monitor table refreshes. Every case runs with fixed seeds, is repeated and reports
+# the median; results are written as JSON and can be compared against an earlier run.
+#
+#   python benchmarks/suite.py --output results.json
+#   python benchmarks/suite.py --quick -k memory
+#   python benchmarks/suite.py --output new.json --compare results.json --threshold 0.15
+#
+# With --compare the exit status is 1 when any case got slower than the threshold allows.
+# The UI cases use the offscreen Qt platform and are skipped when PyQt5 is not installed.
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import profiling
+from kernel import (
+    MemoryManager,
+    ProcessManager,
+    ProcessScheduler,
+    SimulationClock,
+    SimulationEngine,
+    reset_simulation
+)
+
+CASES = []  # (name, function, [params for the full run], [params for --quick])
+APPLICATION = None
+
+
+def case(name, full, quick):
+    def register(func):
+        CASES.append((name, func, full, quick))
+        return func
+    return register
+
+
+def setup_simulation(pages, policy="rr", cores=8):
+    reset_simulation()
+    SimulationClock.configure(mode="fast", seed=0)
+    ProcessManager.configure_memory(total_pages=pages)
+    ProcessScheduler.configure(policy, cpu_cores=cores, background_services=False)
+    SimulationEngine().auto_start = False
+    return ProcessManager()
+
+
+# Each case returns the time of one operation in microseconds
+
+@case("memory.allocate_page", [{'pages': 10_000}, {'pages': 100_000}], [{'pages': 10_000}])
+def memory_allocate_page(pages):
+    SimulationClock().reset()
+    memory = MemoryManager(pages)
+    start = time.perf_counter()
+    for i in range(pages):
+        memory.allocate_page(i % 100)
+    return (time.perf_counter() - start) / pages * 1e6
+
+
+@case("memory.allocate_page_evicting", [{'pages': 10_000, 'policy': 'lru'}, {'pages': 10_000, 'policy': 'clock'}],
+      [{'pages': 10_000, 'policy': 'lru'}])
+def memory_allocate_page_evicting(pages, policy):
+    # Memory is already full, every allocation evicts a page to swap
+    SimulationClock().reset()
+    memory = MemoryManager(pages, policy)
+    memory.allocate_pages(1_000_000, pages)
+    start = time.perf_counter()
+    for i in range(pages):
+        memory.allocate_page(i % 100)
+    return (time.perf_counter() - start) / pages * 1e6
+
+
+@case("memory.free_pages", [{'pages': 10_000}, {'pages': 100_000}], [{'pages': 10_000}])
+def memory_free_pages(pages):
+    # Time per freed page, 100 processes owning an equal share of memory
+    SimulationClock().reset()
+    memory = MemoryManager(pages)
+    for pid in range(100):
+        memory.allocate_pages(pid, pages // 100)
+    start = time.perf_counter()
+    for pid in range(100):
+        memory.free_pages(pid)
+    return (time.perf_counter() - start) / pages * 1e6
+
+
+@case("scheduler.schedule_processes", [{'processes': 100}, {'processes': 1_000}, {'processes': 10_000}],
+      [{'processes': 100}, {'processes': 1_000}])
+def scheduler_schedule_processes(processes, ticks=200):
+    process_manager = setup_simulation(processes * 8)
+    scheduler = ProcessScheduler()
+    rng = random.Random(0)
+    for _ in range(processes):
+        process_manager.create_process("bench", rng.randint(1, 3))
+    engine = scheduler.engine
+    engine.run_ticks(20)  # settle the state distribution
+
+    profiling.reset()
+    profiling.enable()
+    try:
+        engine.run_ticks(ticks)
+    finally:
+        profiling.disable()
+    stats = [s for s in profiling.report() if s.name == "ProcessScheduler.schedule_processes"]
+    return sum(s.total for s in stats) / ticks * 1e6
+
+
+@case("process.create_terminate", [{'processes': 1_000}, {'processes': 10_000}], [{'processes': 1_000}])
+def process_create_terminate(processes):
+    # One create plus one terminate through ProcessManager, with the scheduler running
+    process_manager = setup_simulation(processes * 8)
+    ProcessScheduler()
+    rng = random.Random(0)
+    priorities = [rng.randint(1, 3) for _ in range(processes)]
+    start = time.perf_counter()
+    pids = [process_manager.create_process("churn", priority) for priority in priorities]
+    for pid in pids:
+        process_manager.terminate_process(pid)
+    return (time.perf_counter() - start) / processes * 1e6
+
+
+def qt_application():
+    # Kept for the whole run: dropping the last reference destroys the application along
+    # with objects that outlive a case, like the shared metrics sampler
+    global APPLICATION
+    from PyQt5.QtWidgets import QApplication
+    if APPLICATION is None:
+        APPLICATION = QApplication.instance() or QApplication(sys.argv)
+    return APPLICATION
+
+
+def table_refresh(window_class, processes, refreshes=10):
+    from Main import MetricsSampler
+
+    app = qt_application()
+    process_manager = setup_simulation(processes * 8)
+    ProcessScheduler()
+    rng = random.Random(0)
+    for _ in range(processes - 1):  # the window registers itself as well
+        process_manager.create_process("bench", rng.randint(1, 3))
+
+    window = window_class()
+    MetricsSampler().timer.stop()  # refreshes are driven by the loop below
+    window.show()
+    app.processEvents()
+    engine = SimulationEngine()
+    elapsed = 0.0
+    for _ in range(refreshes):
+        engine.tick()
+        start = time.perf_counter()
+        window.update_process_list()
+        window.process_table.viewport().repaint()
+        elapsed += time.perf_counter() - start
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return elapsed / refreshes * 1e6
+
+
+@case("ui.resource_monitor_refresh", [{'processes': 100}, {'processes': 1_000}, {'processes': 10_000}],
+      [{'processes': 100}, {'processes': 1_000}])
+def resource_monitor_refresh(processes):
+    from Main import ResourceMonitor
+    return table_refresh(ResourceMonitor, processes)
+
+
+@case("ui.task_manager_refresh", [{'processes': 100}, {'processes': 1_000}, {'processes': 10_000}],
+      [{'processes': 100}, {'processes': 1_000}])
+def task_manager_refresh(processes):
+    from Main import TaskManager
+    return table_refresh(TaskManager, processes)
+
+
+def qt_available():
+    try:
+        import PyQt5.QtWidgets  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def result_key(result):
+    return result['name'] + json.dumps(result['params'], sort_keys=True)
+
+
+def run_suite(quick=False, pattern=None, repeat=5):
+    results = []
+    has_qt = qt_available()
+    for name, func, full, quick_params in CASES:
+        if pattern and pattern not in name:
+            continue
+        if name.startswith("ui.") and not has_qt:
+            print(f"{name:<32} skipped, PyQt5 is not installed", file=sys.stderr)
+            continue
+        for params in (quick_params if quick else full):
+            samples = [func(**params) for _ in range(repeat)]
+            result = {
+                'name': name,
+                'params': params,
+                'unit': "us/op",
+                'median': statistics.median(samples),
+                'min': min(samples),
+                'samples': samples
+            }
+            results.append(result)
+            print(f"{name:<32} {json.dumps(params):<36} {result['median']:>12.2f} us/op", file=sys.stderr)
+    reset_simulation()
+    return results
+
+
+def compare(results, baseline, threshold):
+    # Returns the cases whose median grew by more than threshold (0.1 = 10 %)
+    previous = {result_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        before = previous.get(result_key(result))
+        if before is None or not before['median']:
+            continue
+        change = result['median'] / before['median'] - 1
+        marker = "REGRESSION" if change > threshold else ""
+        print(f"{result['name']:<32} {json.dumps(result['params']):<36} {change:>+8.1%} {marker}", file=sys.stderr)
+        if change > threshold:
+            regressions.append((result, before, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Py-OS benchmark suite.")
+    parser.add_argument("--output", help="write the results as JSON to this file (default: stdout)")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, for a fast check")
+    parser.add_argument("-k", dest="pattern", help="only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case, the median is reported")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown counted as a regression with --compare (default 0.1)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.quick, args.pattern, args.repeat)
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': args.quick,
+            'repeat': args.repeat
+        },
+        'results': results
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+# Times a Task Manager refresh (snapshot, model update and repaint) with 100, 1k and 10k
+# processes and counts the widgets the window owns, using the offscreen Qt platform.
+#
+#   python benchmarks/task_manager_refresh.py
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication, QWidget
+
+from kernel import ProcessManager, SimulationClock, SimulationEngine, reset_simulation
+from Main import MetricsSampler, TaskManager
+
+ROW_COUNTS = [100, 1_000, 10_000]
+REFRESHES = 10
+
+
+def measure(app, rows):
+    reset_simulation()
+    SimulationClock.configure(mode="fast", seed=0)
+    ProcessManager.configure_memory(total_pages=rows * 8)
+    SimulationEngine().auto_start = False
+    process_manager = ProcessManager()
+    for i in range(rows - 1):  # the Task Manager registers itself as well
+        process_manager.create_process("bench", 1 + i % 3)
+
+    window = TaskManager()
+    MetricsSampler().timer.stop()  # refreshes are driven by the loop below
+    window.show()
+    app.processEvents()
+
+    # A tick between refreshes, otherwise every refresh after the first has nothing to update
+    engine = SimulationEngine()
+    elapsed = 0.0
+    for _ in range(REFRESHES):
+        engine.tick()
+        start = time.perf_counter()
+        window.update_process_list()
+        window.process_table.viewport().repaint()
+        elapsed += time.perf_counter() - start
+    elapsed /= REFRESHES
+
+    widgets = len(window.findChildren(QWidget))
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return elapsed, widgets
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    print(f"{'Rows':>7} {'Refresh ms':>11} {'Widgets':>8}")
+    for rows in ROW_COUNTS:
+        elapsed, widgets = measure(app, rows)
+        print(f"{rows:>7} {elapsed * 1000:>11.1f} {widgets:>8}")
+
+
+if __name__ == "__main__":
+    main()
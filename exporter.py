@@ -0,0 +1,166 @@
+# Optional metrics exporter: serves scheduler, memory and process-state counters over a
+# local HTTP endpoint, as Prometheus text (/metrics) and JSON (/metrics.json).
+#
+#   python -m headless workload.json --scale 1 --export-port 9464
+#   python Main.py --export-port 9464
+#   curl http://127.0.0.1:9464/metrics
+#
+# The snapshot is taken on the simulation engine thread after a tick, at most once per
+# refresh interval, and swapped in as a whole. Requests only render that snapshot, so a
+# scrape never takes the engine lock or walks the process table.
+
+import json
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+from kernel import ProcessManager, ProcessScheduler, ProcessState, SimulationEngine
+
+DEFAULT_PORT = 9464
+
+
+def collect_snapshot():
+    # Called with the engine lock held, so every counter comes from the same tick
+    engine = SimulationEngine()
+    process_manager = ProcessManager()
+    memory = process_manager.memory_manager
+    processes = process_manager.get_all_processes()
+    states = Counter(p.state.value for p in processes)
+
+    snapshot = {
+        'tick': engine.current_tick,
+        'time': engine.clock.now(),
+        'processes': {state.value: states.get(state.value, 0) for state in ProcessState},
+        'memory': {
+            'total_pages': len(memory.pages),
+            'used_pages': memory.used_page_count(),
+            'free_pages': memory.free_page_count(),
+            'page_faults': memory.page_faults,
+            'replacement': memory.replacement_stats()
+        },
+        'scheduler': None
+    }
+    # Only report the scheduler if something started it, creating it here would start
+    # the background services
+    scheduler = ProcessScheduler._instance
+    if scheduler is not None and scheduler.initialized:
+        stats = scheduler.stats()
+        stats['run_queue_length'] = [len(core.run_queue) for core in scheduler.cores]
+        snapshot['scheduler'] = stats
+    return snapshot
+
+
+def render_prometheus(snapshot):
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        # samples: [(labels dict, value)]
+        lines.append(f"# HELP pyos_{name} {help_text}")
+        lines.append(f"# TYPE pyos_{name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+            lines.append(f"pyos_{name}{{{label_text}}} {value}" if label_text else f"pyos_{name} {value}")
+
+    metric("ticks_total", "counter", "Simulation ticks since start.", [({}, snapshot['tick'])])
+    metric("processes", "gauge", "Processes per state.",
+           [({'state': state}, count) for state, count in snapshot['processes'].items()])
+
+    memory = snapshot['memory']
+    metric("memory_pages", "gauge", "Memory pages by use.",
+           [({'use': 'used'}, memory['used_pages']), ({'use': 'free'}, memory['free_pages'])])
+    metric("memory_pages_capacity", "gauge", "Size of the system memory in pages.", [({}, memory['total_pages'])])
+    metric("memory_page_faults_total", "counter", "Page faults since start.", [({}, memory['page_faults'])])
+    replacement = memory['replacement']
+    if replacement:
+        policy = {'policy': replacement['policy']}
+        metric("memory_replacement_hits_total", "counter", "Page accesses that hit a resident page.",
+               [(policy, replacement['hits'])])
+        metric("memory_replacement_evictions_total", "counter", "Pages evicted to swap.",
+               [(policy, replacement['evictions'])])
+        metric("memory_swapped_pages", "gauge", "Pages currently in swap.",
+               [(policy, replacement['swapped_pages'])])
+
+    scheduler = snapshot['scheduler']
+    if scheduler:
+        for name, help_text in [
+            ("context_switches", "Processes dispatched onto a core."),
+            ("preemptions", "Running processes preempted by the policy."),
+            ("steals", "Processes stolen by idle cores."),
+            ("migrations", "Processes moved to another core's run queue."),
+            ("completed", "Processes that finished their burst.")
+        ]:
+            metric(f"scheduler_{name}_total", "counter", help_text, [({}, scheduler[name])])
+        metric("scheduler_run_queue_length", "gauge", "Processes waiting in each core's run queue.",
+               [({'core': str(core)}, length) for core, length in enumerate(scheduler['run_queue_length'])])
+        metric("scheduler_core_utilization", "gauge", "Share of ticks each core was busy.",
+               [({'core': str(core)}, f"{value:.4f}") for core, value in enumerate(scheduler['core_utilization'])])
+        metric("scheduler_load_imbalance", "gauge", "Average load difference between cores.",
+               [({}, f"{scheduler['load_imbalance']:.4f}")])
+    return "\n".join(lines) + "\n"
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        snapshot = self.server.exporter.snapshot
+        if self.path == "/metrics":
+            body = render_prometheus(snapshot).encode('utf-8')
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/metrics.json":
+            body = json.dumps(snapshot).encode('utf-8')
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would flood the console
+
+
+class MetricsExporter:
+    def __init__(self, port=DEFAULT_PORT, host="127.0.0.1", refresh=1.0):
+        self.host = host
+        self.port = port
+        self.refresh = refresh  # seconds of wall time between snapshots
+        self.snapshot = None
+        self.last_refresh = 0.0
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        engine = SimulationEngine()
+        with engine.lock:
+            self.take_snapshot()
+            engine.add_tick_listener(self.on_tick)
+        self.server = ThreadingHTTPServer((self.host, self.port), MetricsRequestHandler)
+        self.server.daemon_threads = True
+        self.server.exporter = self
+        self.port = self.server.server_address[1]  # resolves port 0
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        engine = SimulationEngine()
+        with engine.lock:
+            if self.on_tick in engine.tick_listeners:
+                engine.tick_listeners.remove(self.on_tick)
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            self.thread = None
+
+    def take_snapshot(self):
+        self.snapshot = collect_snapshot()
+        self.last_refresh = time.monotonic()
+
+    def on_tick(self):
+        # Runs on the engine thread; in fast mode most ticks return here
+        if time.monotonic() - self.last_refresh >= self.refresh:
+            self.take_snapshot()
@@ -0,0 +1,194 @@
+# Headless simulator runner: drives the process/memory simulation from a workload file
+# without importing Qt and prints the resulting metrics as JSON.
+#
+#   python -m headless workload.json [--ticks N] [--seed N] [--policy rr] [--cores 8]
+#   python -m headless workload.json --scale 1 --export-port 9464
+#   python Main.py --headless workload.json
+#
+# A workload file is a JSON object, every key is optional:
+#
+#   {
+#       "seed": 1,
+#       "ticks": 5000,
+#       "cpu_cores": 4,
+#       "policy": "rr",
+#       "policy_options": {"quantum": 2},
+#       "memory": {"total_pages": 4096, "replacement_policy": "lru"},
+#       "background_services": false,
+#       "processes": [
+#           {"name": "job", "priority": 2, "burst": 20, "arrival": 0, "count": 100}
+#       ]
+#   }
+#
+# Without "processes" the built-in background services are simulated.
+# Processes without a burst run until the tick limit. The run ends at the tick limit or
+# as soon as every process has finished and no more arrivals are pending.
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+
+from kernel import (
+    REPLACEMENT_POLICIES,
+    SCHEDULING_POLICIES,
+    ProcessManager,
+    ProcessScheduler,
+    SimulationClock,
+    SimulationEngine,
+    reset_simulation
+)
+
+DEFAULT_TICKS = 1000
+
+
+def load_workload(path):
+    if path is None:
+        return {}
+    if path == "-":
+        return json.load(sys.stdin)
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def expand_arrivals(workload):
+    # [(arrival_tick, name, priority, burst, affinity)] sorted by arrival
+    arrivals = []
+    for spec in workload.get("processes", []):
+        for _ in range(spec.get("count", 1)):
+            arrivals.append((
+                spec.get("arrival", 0),
+                spec.get("name", "process"),
+                spec.get("priority", 1),
+                spec.get("burst"),
+                spec.get("affinity")
+            ))
+    arrivals.sort(key=lambda arrival: arrival[0])
+    return arrivals
+
+
+def collect_metrics(scheduler, process_manager):
+    memory = process_manager.memory_manager
+    states = Counter(p.state.value for p in process_manager.get_all_processes())
+    return {
+        'tick': scheduler.engine.current_tick,
+        'processes': len(process_manager.processes),
+        'states': dict(states),
+        'scheduler': scheduler.stats(),
+        'memory': {
+            'total_pages': len(memory.pages),
+            'used_pages': memory.used_page_count(),
+            'free_pages': memory.free_page_count(),
+            'page_faults': memory.page_faults,
+            'replacement': memory.replacement_stats()
+        }
+    }
+
+
+def run_workload(workload, ticks=None, scale=None, interval=None, out=sys.stdout, export_port=None):
+    reset_simulation()
+    memory = workload.get("memory", {})
+    SimulationClock.configure(
+        mode="fast" if scale is None else "realtime",
+        scale=scale,
+        seed=workload.get("seed", 0)
+    )
+    # Without a policy in the workload a previous run's policy must not carry over
+    ProcessManager.configure_memory(memory.get("total_pages"), memory.get("replacement_policy", "none"))
+    ProcessScheduler.configure(
+        workload.get("policy", "priority"),
+        cpu_cores=workload.get("cpu_cores"),
+        # Without a process list the built-in background services are the workload
+        background_services=workload.get("background_services", not workload.get("processes")),
+        **workload.get("policy_options", {})
+    )
+
+    engine = SimulationEngine()
+    engine.auto_start = False
+    process_manager = ProcessManager()
+    scheduler = ProcessScheduler()
+    clock = engine.clock
+
+    max_ticks = ticks or workload.get("ticks", DEFAULT_TICKS)
+    pending = expand_arrivals(workload)
+    next_arrival = 0
+    exporter = None
+    if export_port is not None:
+        # Imported on demand, http.server alone would double the startup time
+        from exporter import MetricsExporter
+        exporter = MetricsExporter(export_port).start()
+    started = time.perf_counter()
+
+    try:
+        while engine.current_tick < max_ticks:
+            while next_arrival < len(pending) and pending[next_arrival][0] <= engine.current_tick:
+                _, name, priority, burst, affinity = pending[next_arrival]
+                process_manager.create_process(name, priority, burst=burst, affinity=affinity)
+                next_arrival += 1
+            if next_arrival == len(pending) and not process_manager.processes:
+                break
+
+            engine.tick()
+            if interval and engine.current_tick % interval == 0:
+                out.write(json.dumps(collect_metrics(scheduler, process_manager)) + "\n")
+            if scale is not None:
+                clock.wait_for_next_tick()
+    finally:
+        if exporter is not None:
+            exporter.stop()
+
+    wall_seconds = time.perf_counter() - started
+    metrics = collect_metrics(scheduler, process_manager)
+    metrics['wall_seconds'] = wall_seconds
+    metrics['ticks_per_second'] = engine.current_tick / wall_seconds if wall_seconds else 0.0
+    return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Py-OS simulator without the desktop.")
+    parser.add_argument("workload", nargs="?", help="workload JSON file, '-' for stdin")
+    parser.add_argument("--ticks", type=int, help="stop after this many ticks")
+    parser.add_argument("--seed", type=int, help="override the workload seed")
+    parser.add_argument("--policy", choices=sorted(SCHEDULING_POLICIES), help="scheduling policy")
+    parser.add_argument("--cores", type=int, help="number of simulated CPU cores")
+    parser.add_argument("--pages", type=int, help="total memory pages")
+    parser.add_argument("--replacement", choices=sorted(REPLACEMENT_POLICIES) + ["none"],
+                        help="page replacement policy")
+    parser.add_argument("--scale", type=float,
+                        help="run in scaled real time (1.0 = one tick per second) instead of as fast as possible")
+    parser.add_argument("--interval", type=int, help="also print metrics every N ticks as JSON lines")
+    parser.add_argument("--output", help="write the final metrics to this file instead of stdout")
+    parser.add_argument("--export-port", type=int,
+                        help="serve live metrics on http://127.0.0.1:PORT/metrics while running")
+    args = parser.parse_args(argv)
+
+    workload = load_workload(args.workload)
+    if args.seed is not None:
+        workload["seed"] = args.seed
+    if args.policy and args.policy != workload.get("policy"):
+        workload["policy"] = args.policy
+        workload["policy_options"] = {}  # options of the workload policy may not apply
+    if args.cores:
+        workload["cpu_cores"] = args.cores
+    if args.pages or args.replacement:
+        memory = workload.setdefault("memory", {})
+        if args.pages:
+            memory["total_pages"] = args.pages
+        if args.replacement:
+            memory["replacement_policy"] = args.replacement
+
+    metrics = run_workload(workload, ticks=args.ticks, scale=args.scale, interval=args.interval,
+                           export_port=args.export_port)
+    # One line per object when mixed with the --interval JSON lines
+    text = json.dumps(metrics, indent=None if args.interval else 2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1593 @@
+import time
+import random
+import math
+import heapq
+import itertools
+import copy
+from threading import Thread, RLock
+from array import array
+from enum import Enum
+from collections import OrderedDict
+
+from profiling import instrumented
+
+np = None  # NumPy, imported by the vectorized simulation backend when first used
+
+
+# The scheduler dispatches READY processes onto a fixed number of CPU slots where:
+# - The scheduling policy (priority, round-robin, MLFQ, CFS or SJF) picks the next process
+# - Each of the N simulated CPU cores (3 by default) runs one process from its own run queue
+# - Idle cores steal work from the busiest run queue, respecting per-process CPU affinity
+# - Processes randomly block, wake up and yield to simulate real system behavior
+
+# simulation clock
+class SimulationClock:
+    # Virtual time shared by the simulator: one tick advances it by tick_seconds, and every
+    # random decision comes from rng so a seeded run is reproducible. In "realtime" mode
+    # the engine thread paces ticks to tick_seconds / scale of wall time, in "fast" mode
+    # it ticks as fast as it can.
+    _instance = None
+    mode = "realtime"
+    scale = 1.0
+    tick_seconds = 1.0
+    seed = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(SimulationClock, cls).__new__(cls)
+            cls._instance.reset()
+        return cls._instance
+
+    @classmethod
+    def configure(cls, mode=None, scale=None, tick_seconds=None, seed=None):
+        if mode is not None:
+            if mode not in ("realtime", "fast"):
+                raise ValueError(f"Unknown clock mode: {mode}")
+            cls.mode = mode
+        if scale is not None:
+            if scale <= 0:
+                raise ValueError("scale must be positive")
+            cls.scale = scale
+        if tick_seconds is not None:
+            cls.tick_seconds = tick_seconds
+        if seed is not None:
+            cls.seed = seed
+        if cls._instance is not None:
+            cls._instance.reset()
+
+    def reset(self):
+        self.ticks = 0
+        self.rng = random.Random(self.seed)
+        self.wall_start = None
+
+    def now(self):
+        # Virtual seconds since the simulation started
+        return self.ticks * self.tick_seconds
+
+    def advance(self):
+        self.ticks += 1
+
+    def wait_for_next_tick(self):
+        if self.mode == "fast":
+            time.sleep(0)  # still let other threads run
+            return
+        interval = self.tick_seconds / self.scale
+        wall_now = time.monotonic()
+        if self.wall_start is None:
+            self.wall_start = wall_now - self.ticks * interval
+        delay = self.wall_start + (self.ticks + 1) * interval - wall_now
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -interval:
+            # Fell behind (e.g. a slow tick), resync instead of bursting to catch up
+            self.wall_start = wall_now - self.ticks * interval
+
+
+# memory management
+FREE_PAGE = -1  # owner value stored in the page table for unused pages
+
+
+class MemoryPage:
+    # Lightweight view over one row of a PageTable, kept for code that used page objects
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def is_used(self):
+        return bool(self.table.used[self.index])
+
+    @property
+    def process_id(self):
+        owner = self.table.owner[self.index]
+        return None if owner == FREE_PAGE else owner
+
+    @property
+    def last_used(self):
+        return self.table.last_used[self.index]
+
+
+class PageTable:
+    # Struct-of-arrays page table: one compact column per field instead of one object per page
+    def __init__(self, total_pages):
+        now = SimulationClock().now()
+        self.owner = array('i', [FREE_PAGE]) * total_pages
+        self.used = array('b', [0]) * total_pages
+        self.last_used = array('d', [now]) * total_pages
+        # Position of the page inside its owner's page list, for O(1) removal
+        self.slot = array('i', [0]) * total_pages
+
+    def __len__(self):
+        return len(self.owner)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.owner)
+        if not 0 <= index < len(self.owner):
+            raise IndexError("page index out of range")
+        return MemoryPage(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.owner)):
+            yield MemoryPage(self, index)
+
+    def assign(self, index, pid, now):
+        self.owner[index] = pid
+        self.used[index] = 1
+        self.last_used[index] = now
+
+    def release(self, index):
+        self.owner[index] = FREE_PAGE
+        self.used[index] = 0
+
+
+# page replacement
+class ReplacementPolicy:
+    name = "none"
+
+    def __init__(self):
+        self.hits = 0
+        self.faults = 0
+        self.evictions = 0
+
+    def on_load(self, index):
+        pass
+
+    def on_access(self, index):
+        pass
+
+    def on_free(self, index):
+        pass
+
+    def choose_victim(self, table):
+        raise NotImplementedError
+
+    def stats(self):
+        return {
+            'policy': self.name,
+            'hits': self.hits,
+            'faults': self.faults,
+            'evictions': self.evictions
+        }
+
+
+class LRUPolicy(ReplacementPolicy):
+    # Keeps pages ordered by last_used so the victim is always at the front
+    name = "LRU"
+
+    def __init__(self):
+        super().__init__()
+        self.order = OrderedDict()
+
+    def on_load(self, index):
+        self.order[index] = None
+
+    def on_access(self, index):
+        self.order.move_to_end(index)
+
+    def on_free(self, index):
+        self.order.pop(index, None)
+
+    def choose_victim(self, table):
+        index, _ = self.order.popitem(last=False)
+        return index
+
+
+class FIFOPolicy(ReplacementPolicy):
+    # Evicts the page that was loaded first, accesses do not change the order
+    name = "FIFO"
+
+    def __init__(self):
+        super().__init__()
+        self.order = OrderedDict()
+
+    def on_load(self, index):
+        self.order[index] = None
+
+    def on_free(self, index):
+        self.order.pop(index, None)
+
+    def choose_victim(self, table):
+        index, _ = self.order.popitem(last=False)
+        return index
+
+
+class ClockPolicy(ReplacementPolicy):
+    # Second-chance: the hand skips (and clears) pages referenced since its last pass
+    name = "Clock"
+
+    def __init__(self):
+        super().__init__()
+        self.referenced = None
+        self.hand = 0
+
+    def _bits(self, table):
+        if self.referenced is None or len(self.referenced) != len(table):
+            self.referenced = array('b', [0]) * len(table)
+        return self.referenced
+
+    def on_load(self, index):
+        if self.referenced is not None:
+            self.referenced[index] = 1
+
+    def on_access(self, index):
+        if self.referenced is not None:
+            self.referenced[index] = 1
+
+    def on_free(self, index):
+        if self.referenced is not None:
+            self.referenced[index] = 0
+
+    def choose_victim(self, table):
+        referenced = self._bits(table)
+        total = len(table)
+        while True:
+            index = self.hand
+            self.hand = (self.hand + 1) % total
+            if not table.used[index]:
+                continue
+            if referenced[index]:
+                referenced[index] = 0
+            else:
+                return index
+
+
+class LFUPolicy(ReplacementPolicy):
+    # Frequency buckets give O(1) access updates; ties are broken by load order
+    name = "LFU"
+
+    def __init__(self):
+        super().__init__()
+        self.counts = {}
+        self.buckets = {}
+        self.min_count = 0
+
+    def _remove(self, index):
+        count = self.counts.pop(index)
+        bucket = self.buckets[count]
+        del bucket[index]
+        if not bucket:
+            del self.buckets[count]
+        return count
+
+    def on_load(self, index):
+        self.counts[index] = 1
+        self.buckets.setdefault(1, OrderedDict())[index] = None
+        self.min_count = 1
+
+    def on_access(self, index):
+        if index not in self.counts:
+            return
+        count = self._remove(index) + 1
+        self.counts[index] = count
+        self.buckets.setdefault(count, OrderedDict())[index] = None
+
+    def on_free(self, index):
+        if index in self.counts:
+            self._remove(index)
+
+    def choose_victim(self, table):
+        if self.min_count not in self.buckets:
+            self.min_count = min(self.buckets)
+        index = next(iter(self.buckets[self.min_count]))
+        self._remove(index)
+        return index
+
+
+REPLACEMENT_POLICIES = {
+    "lru": LRUPolicy,
+    "fifo": FIFOPolicy,
+    "clock": ClockPolicy,
+    "lfu": LFUPolicy
+}
+
+
+def make_replacement_policy(policy):
+    # "none" asks for no policy explicitly: a full memory fails the allocation
+    if policy is None or isinstance(policy, ReplacementPolicy):
+        return policy
+    if policy.lower() == "none":
+        return None
+    try:
+        return REPLACEMENT_POLICIES[policy.lower()]()
+    except KeyError:
+        raise ValueError(f"Unknown replacement policy: {policy}")
+
+
+class SwapSpace:
+    # Simulated backing store, only the number of swapped-out pages per process is tracked
+    def __init__(self):
+        self.pages = {}
+        self.swap_outs = 0
+        self.swap_ins = 0
+
+    def __len__(self):
+        return sum(self.pages.values())
+
+    def store(self, pid):
+        self.pages[pid] = self.pages.get(pid, 0) + 1
+        self.swap_outs += 1
+
+    def load(self, pid):
+        count = self.pages.get(pid, 0)
+        if count == 0:
+            return False
+        if count == 1:
+            del self.pages[pid]
+        else:
+            self.pages[pid] = count - 1
+        self.swap_ins += 1
+        return True
+
+    def pages_for(self, pid):
+        return self.pages.get(pid, 0)
+
+    def discard(self, pid):
+        self.pages.pop(pid, None)
+
+
+class MemoryManager:
+    def __init__(self, total_pages=100, replacement_policy=None):
+        self.pages = PageTable(total_pages)
+        self.page_faults = 0
+        # Free list used as a stack; reversed so the lowest indices are handed out first
+        self.free_list = array('i', range(total_pages - 1, -1, -1))
+        # pid -> list of resident page indices owned by that process
+        self.process_pages = {}
+        # Without a policy a full memory fails the allocation, as before
+        self.replacement_policy = make_replacement_policy(replacement_policy)
+        self.swap = SwapSpace()
+        self.clock = SimulationClock()
+        # Processes allocate from the UI thread while the engine touches pages on its tick
+        self.lock = RLock()
+
+    def _attach(self, index, pid, now):
+        owned = self.process_pages.setdefault(pid, [])
+        self.pages.assign(index, pid, now)
+        self.pages.slot[index] = len(owned)
+        owned.append(index)
+        if self.replacement_policy:
+            self.replacement_policy.on_load(index)
+
+    def _detach(self, index):
+        pid = self.pages.owner[index]
+        owned = self.process_pages[pid]
+        slot = self.pages.slot[index]
+        last = owned.pop()
+        if last != index:
+            owned[slot] = last
+            self.pages.slot[last] = slot
+        if not owned:
+            del self.process_pages[pid]
+        self.pages.release(index)
+        return pid
+
+    def _evict(self):
+        # Moves the policy's victim page to swap and returns its now free index
+        policy = self.replacement_policy
+        index = policy.choose_victim(self.pages)
+        victim_pid = self._detach(index)
+        self.swap.store(victim_pid)
+        policy.evictions += 1
+        return index
+
+    def _fault(self):
+        self.page_faults += 1
+        if self.replacement_policy:
+            self.replacement_policy.faults += 1
+
+    def _can_evict(self):
+        # A policy needs a resident page to make room, a memory of 0 pages has none
+        return self.replacement_policy is not None and bool(self.process_pages)
+
+    def allocate_page(self, pid):
+        with self.lock:
+            if self.free_list:
+                index = self.free_list.pop()
+            else:
+                self._fault()
+                if not self._can_evict():
+                    return False
+                index = self._evict()
+            self._attach(index, pid, self.clock.now())
+            return True
+
+    def allocate_pages(self, pid, count):
+        # Bulk allocation, one page fault is counted for every page that could not be served
+        # from free memory; with a replacement policy those pages are made room for by eviction
+        with self.lock:
+            now = self.clock.now()
+            granted = min(count, len(self.free_list))
+            for _ in range(granted):
+                self._attach(self.free_list.pop(), pid, now)
+            missing = count - granted
+            if not self._can_evict():
+                for _ in range(missing):
+                    self._fault()
+                return granted
+            for _ in range(missing):
+                self._fault()
+                self._attach(self._evict(), pid, now)
+            return count
+
+    def access_page(self, pid):
+        # Touches one page of the process' working set, resident pages are hits and
+        # swapped-out pages are faulted back in
+        with self.lock:
+            owned = self.process_pages.get(pid, ())
+            swapped = self.swap.pages_for(pid)
+            total = len(owned) + swapped
+            if total == 0:
+                return False
+            choice = self.clock.rng.randrange(total)
+            if choice < len(owned):
+                index = owned[choice]
+                self.pages.last_used[index] = self.clock.now()
+                if self.replacement_policy:
+                    self.replacement_policy.hits += 1
+                    self.replacement_policy.on_access(index)
+                return True
+            self._fault()
+            if self.free_list:
+                index = self.free_list.pop()
+            elif self._can_evict():
+                index = self._evict()
+            else:
+                return False
+            self.swap.load(pid)
+            self._attach(index, pid, self.clock.now())
+            return False
+
+    def free_pages(self, pid):
+        with self.lock:
+            for index in self.process_pages.pop(pid, ()):
+                if self.replacement_policy:
+                    self.replacement_policy.on_free(index)
+                self.pages.release(index)
+                self.free_list.append(index)
+            self.swap.discard(pid)
+
+    def free_page_count(self):
+        return len(self.free_list)
+
+    def used_page_count(self):
+        return len(self.pages) - len(self.free_list)
+
+    def replacement_stats(self):
+        if not self.replacement_policy:
+            return None
+        stats = self.replacement_policy.stats()
+        stats['swapped_pages'] = len(self.swap)
+        return stats
+
+class ProcessMemory:
+    def __init__(self, pid):
+        self.pid = pid
+        self.page_count = 0
+
+    def allocate(self, memory_manager, pages_needed):
+        allocated = memory_manager.allocate_pages(self.pid, pages_needed)
+        self.page_count += allocated
+        return allocated
+
+    def free(self, memory_manager):
+        memory_manager.free_pages(self.pid)
+        self.page_count = 0  # Reset page_count when freed
+
+
+class ProcessState(Enum):
+    READY = "Ready"
+    RUNNING = "Running"
+    WAITING = "Waiting"
+    BLOCKED = "Blocked"
+    TERMINATED = "Terminated"
+
+
+# Chance per tick that a process in the given state changes state
+TRANSITION_PROBABILITY = {
+    ProcessState.RUNNING: 0.1,
+    ProcessState.READY: 0.3,
+    ProcessState.WAITING: 0.2,
+    ProcessState.BLOCKED: 0.2
+}
+
+
+class DummyProcess:
+    def __init__(self, pid, name, priority, memory_manager, burst=None):
+        self.pid = pid
+        self.name = name
+        self.priority = priority
+        self.state = ProcessState.READY
+        self.cpu_usage = 0
+        self.clock = SimulationClock()
+        self.start_time = self.clock.now()
+        self.last_state_change = self.start_time
+        self.engine = None
+        self.schedule_token = 0  # bumped on every state change to invalidate pending transitions
+        # Scheduling accounting, in engine ticks. A process with a burst finishes once it has
+        # run for that many ticks, without one it runs until terminated
+        self.burst = burst
+        self.cpu_time = 0
+        self.wait_time = 0
+        self.arrival_tick = 0
+        self.ready_since = 0
+        # Cores the process may run on (None = any) and the core it last ran or queued on
+        self.affinity = None
+        self.core = None
+        self.is_running = True
+        # Memory allocation based on priority
+        self.memory = ProcessMemory(pid)
+        pages_needed = priority * 2
+        self.memory.allocate(memory_manager, pages_needed)
+        self.memory_manager = memory_manager
+
+    def run_tick(self):
+        # Called by the engine every tick while RUNNING
+        self.cpu_time += 1
+        # Simulate CPU usage between 1-100%
+        self.cpu_usage = self.clock.rng.randint(1, 100)
+        # Touch a page of the working set so the replacement policy sees the access
+        self.memory_manager.access_page(self.pid)
+
+    def transition(self):
+        # Called by the engine on the tick a random state change is due
+        if self.state == ProcessState.RUNNING:
+            self.change_state(self.clock.rng.choice([
+                ProcessState.WAITING,
+                ProcessState.BLOCKED,
+                ProcessState.READY
+            ]))
+        elif self.state == ProcessState.READY:
+            self.change_state(ProcessState.RUNNING)
+        elif self.state in [ProcessState.WAITING, ProcessState.BLOCKED]:
+            self.change_state(ProcessState.READY)
+
+    def change_state(self, new_state):
+        # Under the engine lock, so snapshots never see the new state with the old usage
+        engine = self.engine
+        if engine is None:
+            self._set_state(new_state)
+            return
+        with engine.lock:
+            self._set_state(new_state)
+            engine.schedule(self)
+
+    def _set_state(self, new_state):
+        self.state = new_state
+        self.last_state_change = self.clock.now()
+        if new_state != ProcessState.RUNNING:
+            self.cpu_usage = 0
+
+    def start(self):
+        SimulationEngine().add_process(self)
+
+    def stop(self):
+        engine = self.engine
+        if engine is None:
+            self.is_running = False
+            self.state = ProcessState.TERMINATED
+        else:
+            with engine.lock:
+                self.is_running = False
+                self.state = ProcessState.TERMINATED
+                engine.remove_process(self)
+        self.memory.free(self.memory_manager)
+
+
+class SimulationEngine:
+    # Advances every simulated process from a single thread. Instead of rolling the dice
+    # for each process on each tick, the tick of a process' next state change is drawn
+    # up front (geometric distribution) and stored in a timing wheel, so a tick only
+    # touches the processes that change state plus the ones currently running.
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(SimulationEngine, cls).__new__(cls)
+            cls._instance.clock = SimulationClock()
+            cls._instance.wheel = {}  # tick -> [(process, schedule_token)]
+            cls._instance.running = {}  # pid -> process currently in RUNNING state
+            cls._instance.process_count = 0
+            cls._instance.version = 0  # bumped by every tick and state change
+            cls._instance.tick_listeners = []
+            cls._instance.state_listeners = []
+            cls._instance.lock = RLock()
+            cls._instance.thread = None
+            cls._instance.is_running = False
+            cls._instance.auto_start = True  # start the tick thread with the first process
+            # Set by ProcessScheduler: READY processes then wait to be dispatched instead of
+            # starting to run on their own
+            cls._instance.scheduler_dispatch = False
+        return cls._instance
+
+    @property
+    def current_tick(self):
+        return self.clock.ticks
+
+    def add_process(self, process):
+        with self.lock:
+            process.engine = self
+            process.arrival_tick = self.current_tick
+            process.ready_since = self.current_tick
+            self.process_count += 1
+            self.schedule(process)
+        if self.auto_start:
+            self.start()
+
+    def remove_process(self, process):
+        with self.lock:
+            process.engine = None
+            process.schedule_token += 1  # drops its pending wheel entry lazily
+            self.version += 1
+            self.running.pop(process.pid, None)
+            self.process_count -= 1
+            for callback in self.state_listeners:
+                callback(process)
+
+    def add_tick_listener(self, callback):
+        with self.lock:
+            if callback not in self.tick_listeners:
+                self.tick_listeners.append(callback)
+
+    def add_state_listener(self, callback):
+        # callback(process) runs after every state change, including add and removal
+        with self.lock:
+            if callback not in self.state_listeners:
+                self.state_listeners.append(callback)
+
+    def schedule(self, process):
+        with self.lock:
+            process.schedule_token += 1
+            self.version += 1
+            if process.state == ProcessState.RUNNING:
+                self.running[process.pid] = process
+            else:
+                self.running.pop(process.pid, None)
+
+            probability = TRANSITION_PROBABILITY.get(process.state)
+            if process.state == ProcessState.READY and self.scheduler_dispatch:
+                probability = None
+            if probability is not None:
+                # Number of ticks until the first success of a per-tick Bernoulli trial
+                roll = self.clock.rng.random()
+                delay = int(math.log(1.0 - roll) / math.log(1.0 - probability)) + 1
+                self.wheel.setdefault(self.current_tick + delay, []).append(
+                    (process, process.schedule_token)
+                )
+
+            for callback in self.state_listeners:
+                callback(process)
+
+    @instrumented()
+    def tick(self):
+        with self.lock:
+            self.clock.advance()
+            self.version += 1
+            for process in list(self.running.values()):
+                process.run_tick()
+
+            for process, token in self.wheel.pop(self.current_tick, ()):
+                if process.engine is self and process.schedule_token == token:
+                    process.transition()
+
+            for callback in self.tick_listeners:
+                callback()
+
+    def run(self):
+        while self.is_running:
+            self.tick()
+            self.clock.wait_for_next_tick()
+
+    def run_ticks(self, ticks):
+        # Advances the simulation synchronously, without the engine thread or any pacing
+        for _ in range(ticks):
+            self.tick()
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.is_running = True
+            self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.is_running = False
+        self.thread = None
+
+
+# Integer codes used by the vectorized backend, indexed like VECTOR_STATES
+VECTOR_STATES = [
+    ProcessState.READY,
+    ProcessState.RUNNING,
+    ProcessState.WAITING,
+    ProcessState.BLOCKED,
+    ProcessState.TERMINATED
+]
+READY_CODE, RUNNING_CODE, WAITING_CODE, BLOCKED_CODE, TERMINATED_CODE = range(5)
+
+
+class VectorizedSimulation:
+    # Optional NumPy backend for large simulations. State, priority and CPU usage live in
+    # arrays and a tick applies the DummyProcess transition rules to every process with one
+    # batched random draw. Only the process state machine is modelled, not memory accesses.
+    def __init__(self, capacity=1024, seed=None):
+        global np
+        if np is None:
+            try:
+                import numpy as np
+            except ImportError:
+                raise RuntimeError("NumPy is required for the vectorized simulation backend")
+        self.rng = np.random.default_rng(SimulationClock.seed if seed is None else seed)
+        self.state = np.full(capacity, TERMINATED_CODE, dtype=np.int8)
+        self.priority = np.zeros(capacity, dtype=np.int8)
+        self.cpu_usage = np.zeros(capacity, dtype=np.int8)
+        self.size = 0  # slots [0, size) have been handed out at least once
+        self.free_slots = []
+        self.current_tick = 0
+        self.state_changes = 0
+        # Leaving RUNNING picks uniformly among these, in the order DummyProcess uses
+        self.leave_running = np.array([WAITING_CODE, BLOCKED_CODE, READY_CODE], dtype=np.int8)
+
+    def __len__(self):
+        return self.size - len(self.free_slots)
+
+    def _grow(self):
+        capacity = max(1, len(self.state) * 2)
+        for name, fill in (("state", TERMINATED_CODE), ("priority", 0), ("cpu_usage", 0)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add_process(self, priority):
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            if self.size == len(self.state):
+                self._grow()
+            slot = self.size
+            self.size += 1
+        self.state[slot] = READY_CODE
+        self.priority[slot] = priority
+        self.cpu_usage[slot] = 0
+        return slot
+
+    def add_processes(self, priorities):
+        priorities = np.asarray(priorities, dtype=np.int8)
+        while self.size + len(priorities) > len(self.state):
+            self._grow()
+        start = self.size
+        end = start + len(priorities)
+        self.state[start:end] = READY_CODE
+        self.priority[start:end] = priorities
+        self.cpu_usage[start:end] = 0
+        self.size = end
+        return range(start, end)
+
+    def remove_process(self, slot):
+        if self.state[slot] != TERMINATED_CODE:
+            self.state[slot] = TERMINATED_CODE
+            self.cpu_usage[slot] = 0
+            self.free_slots.append(slot)
+
+    def tick(self):
+        n = self.size
+        state = self.state[:n]
+        draws = self.rng.random((2, n))
+        roll = draws[0]
+
+        running = state == RUNNING_CODE
+        leaving = running & (roll < TRANSITION_PROBABILITY[ProcessState.RUNNING])
+        starting = (state == READY_CODE) & (roll < TRANSITION_PROBABILITY[ProcessState.READY])
+        waking = ((state == WAITING_CODE) | (state == BLOCKED_CODE)) & (
+            roll < TRANSITION_PROBABILITY[ProcessState.WAITING]
+        )
+
+        # Given roll < p the roll is uniform on [0, p), so it also picks the new state
+        choice = (roll[leaving] * (3 / TRANSITION_PROBABILITY[ProcessState.RUNNING])).astype(np.intp)
+        state[leaving] = self.leave_running[np.minimum(choice, 2)]
+        state[starting] = RUNNING_CODE
+        state[waking] = READY_CODE
+
+        # Processes that stayed RUNNING use 1-100% CPU, everything else 0
+        still_running = running & ~leaving
+        cpu = (draws[1] * 100).astype(np.int8) + 1
+        self.cpu_usage[:n] = np.where(still_running, cpu, 0)
+
+        self.current_tick += 1
+        self.state_changes += int(np.count_nonzero(leaving) + np.count_nonzero(starting)
+                                  + np.count_nonzero(waking))
+
+    def state_counts(self):
+        counts = np.bincount(self.state[:self.size], minlength=len(VECTOR_STATES))
+        return {VECTOR_STATES[code]: int(counts[code]) for code in range(TERMINATED_CODE)}
+
+
+# scheduling policies
+class SchedulingPolicy:
+    # Ready queue of a scheduler. Entries live in a heap ordered by key(); a process that is
+    # removed or re-queued leaves a stale entry behind that is skipped when popped
+    name = "base"
+    quantum = None  # ticks a process may run before it is preempted, None = run until it blocks
+
+    def __init__(self):
+        self.heap = []
+        self.queued = {}  # pid -> token of the live heap entry
+        self.sequence = itertools.count()
+
+    def __len__(self):
+        return len(self.queued)
+
+    def key(self, process):
+        raise NotImplementedError
+
+    def enqueue(self, process):
+        token = next(self.sequence)
+        self.queued[process.pid] = token
+        heapq.heappush(self.heap, (self.key(process), token, process))
+        if len(self.heap) > 2 * len(self.queued) + 64:
+            self.rebuild()
+
+    def dequeue(self):
+        self._drop_stale()
+        if not self.heap:
+            return None
+        _, _, process = heapq.heappop(self.heap)
+        del self.queued[process.pid]
+        return process
+
+    def steal(self, predicate, limit=16):
+        # Takes the first queued process accepted by predicate, looking at most limit entries
+        # deep; the entries passed over keep their place in the queue
+        skipped = []
+        found = None
+        while len(skipped) < limit:
+            self._drop_stale()
+            if not self.heap:
+                break
+            entry = heapq.heappop(self.heap)
+            if predicate(entry[2]):
+                found = entry[2]
+                del self.queued[found.pid]
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self.heap, entry)
+        return found
+
+    def peek_key(self):
+        self._drop_stale()
+        return self.heap[0][0] if self.heap else None
+
+    def _drop_stale(self):
+        while self.heap and self.queued.get(self.heap[0][2].pid) != self.heap[0][1]:
+            heapq.heappop(self.heap)
+
+    def rebuild(self):
+        # Recomputes every key, also used when keys of queued processes change
+        self.heap = [
+            (self.key(process), token, process)
+            for _, token, process in self.heap
+            if self.queued.get(process.pid) == token
+        ]
+        heapq.heapify(self.heap)
+
+    def discard(self, process):
+        # Takes the process out of the queue
+        self.queued.pop(process.pid, None)
+
+    def remove(self, process):
+        # The process terminated, also forget any per-process state
+        self.discard(process)
+
+    def on_tick(self, tick):
+        pass
+
+    def on_run_tick(self, process):
+        pass
+
+    def on_preempt(self, process, slice_used):
+        pass
+
+    def should_preempt(self, process, slice_used):
+        return self.quantum is not None and slice_used >= self.quantum
+
+
+class PriorityPolicy(SchedulingPolicy):
+    # Higher number = higher priority, equal priorities are served first come first served
+    name = "Priority"
+
+    def key(self, process):
+        return -process.priority
+
+
+class RoundRobinPolicy(SchedulingPolicy):
+    name = "Round Robin"
+
+    def __init__(self, quantum=2):
+        super().__init__()
+        self.quantum = quantum
+
+    def key(self, process):
+        return 0  # FIFO, ties are broken by queue order
+
+
+class SJFPolicy(SchedulingPolicy):
+    # Shortest (remaining) job first, processes without a burst go last
+    name = "SJF"
+
+    def key(self, process):
+        if process.burst is None:
+            return math.inf
+        return process.burst - process.cpu_time
+
+
+class MLFQPolicy(SchedulingPolicy):
+    # New processes start in the top level; using a whole quantum moves a process down a
+    # level, and every boost_interval ticks all processes are moved back to the top
+    name = "MLFQ"
+
+    def __init__(self, quanta=(1, 2, 4), boost_interval=50):
+        super().__init__()
+        self.quanta = quanta
+        self.boost_interval = boost_interval
+        self.levels = {}
+
+    def key(self, process):
+        return self.levels.get(process.pid, 0)
+
+    def remove(self, process):
+        super().remove(process)
+        self.levels.pop(process.pid, None)
+
+    def on_tick(self, tick):
+        if tick % self.boost_interval == 0 and self.levels:
+            self.levels.clear()
+            self.rebuild()
+
+    def on_preempt(self, process, slice_used):
+        # Making way for a higher level before the quantum is used up keeps the level
+        level = self.levels.get(process.pid, 0)
+        if slice_used >= self.quanta[level]:
+            self.levels[process.pid] = min(level + 1, len(self.quanta) - 1)
+
+    def should_preempt(self, process, slice_used):
+        level = self.levels.get(process.pid, 0)
+        if slice_used >= self.quanta[level]:
+            return True
+        waiting_level = self.peek_key()
+        return waiting_level is not None and waiting_level < level
+
+
+class CFSPolicy(SchedulingPolicy):
+    # Completely-fair style: the process with the smallest virtual runtime runs next, and
+    # virtual runtime grows more slowly for higher priorities
+    name = "CFS"
+
+    def __init__(self, min_granularity=1):
+        super().__init__()
+        self.min_granularity = min_granularity
+        self.vruntime = {}
+        self.min_vruntime = 0.0
+
+    def key(self, process):
+        return self.vruntime.get(process.pid, 0.0)
+
+    def enqueue(self, process):
+        # Newcomers and sleepers start at the current minimum instead of catching up
+        self.vruntime[process.pid] = max(self.vruntime.get(process.pid, 0.0), self.min_vruntime)
+        super().enqueue(process)
+
+    def dequeue(self):
+        process = super().dequeue()
+        if process is not None:
+            self.min_vruntime = max(self.min_vruntime, self.vruntime[process.pid])
+        return process
+
+    def remove(self, process):
+        super().remove(process)
+        self.vruntime.pop(process.pid, None)
+
+    def on_run_tick(self, process):
+        self.vruntime[process.pid] = self.vruntime.get(process.pid, 0.0) + 1.0 / max(process.priority, 1)
+
+    def should_preempt(self, process, slice_used):
+        if slice_used < self.min_granularity:
+            return False
+        waiting = self.peek_key()
+        return waiting is not None and waiting < self.vruntime.get(process.pid, 0.0)
+
+
+SCHEDULING_POLICIES = {
+    "priority": PriorityPolicy,
+    "rr": RoundRobinPolicy,
+    "mlfq": MLFQPolicy,
+    "cfs": CFSPolicy,
+    "sjf": SJFPolicy
+}
+
+
+def make_scheduling_policy(policy, **options):
+    if isinstance(policy, SchedulingPolicy):
+        return policy
+    try:
+        return SCHEDULING_POLICIES[policy.lower()](**options)
+    except KeyError:
+        raise ValueError(f"Unknown scheduling policy: {policy}")
+
+
+class CpuCore:
+    def __init__(self, core_id, run_queue):
+        self.core_id = core_id
+        self.run_queue = run_queue
+        self.current = None     # process running on this core
+        self.slice_used = 0     # ticks since current was dispatched
+        self.busy_ticks = 0
+
+    def load(self):
+        return len(self.run_queue) + (self.current is not None)
+
+    def allows(self, process):
+        return process.affinity is None or self.core_id in process.affinity
+
+
+_DUMMY_PROCESSES_CREATED = False
+
+class ProcessScheduler:
+    _instance = None
+    cpu_cores = 3  # Number of simulated cores, each runs one process at a time
+    policy = "priority"
+    policy_options = {}
+    background_services = True  # create the dummy service processes on first use
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ProcessScheduler, cls).__new__(cls)
+            cls._instance.initialized = False
+        return cls._instance
+
+    @classmethod
+    def configure(cls, policy=None, cpu_cores=None, background_services=None, **policy_options):
+        # Selects the scheduling policy and core count; must be called before first use
+        if cls._instance is not None and cls._instance.initialized:
+            raise RuntimeError("The scheduler is already running")
+        if policy is not None:
+            cls.policy = policy
+            cls.policy_options = policy_options
+        if cpu_cores is not None:
+            if cpu_cores < 1:
+                raise ValueError("cpu_cores must be at least 1")
+            cls.cpu_cores = cpu_cores
+        if background_services is not None:
+            cls.background_services = background_services
+
+    def __init__(self):
+        # ProcessScheduler() is called from UI refreshes, only set up on first use
+        if self.initialized:
+            return
+        self.initialized = True
+        self.process_manager = ProcessManager()
+        self.memory_manager = self.process_manager.memory_manager
+        self.current_pid = ProcessManager._next_pid  # Sync PID counter
+        self._dummy_processes_created = False
+
+        self.cores = [CpuCore(core_id, self.make_run_queue()) for core_id in range(self.cpu_cores)]
+        self.ready = set()      # pids waiting in some core's run queue
+        self.running = {}       # pid -> process on a core
+        self.dirty = False
+
+        # Statistics, times in engine ticks
+        self.engine = SimulationEngine()
+        self.start_tick = self.engine.current_tick
+        self.completed = 0
+        self.total_turnaround = 0
+        self.total_waiting = 0
+        self.context_switches = 0
+        self.preemptions = 0
+        self.steals = 0
+        self.migrations = 0
+        self.imbalance_total = 0
+        self.imbalance_samples = 0
+
+        # Scheduling runs on the simulation engine's tick instead of its own thread and
+        # only reacts to state changes reported by the engine
+        with self.engine.lock:
+            self.engine.scheduler_dispatch = True
+            self.engine.add_state_listener(self.on_state_change)
+            # Re-scheduling drops pending READY -> RUNNING transitions of existing processes.
+            # Processes already running hold no slot yet, they queue up like the others
+            for process in self.process_manager.get_all_processes():
+                if process.state == ProcessState.RUNNING:
+                    process.change_state(ProcessState.READY)
+                else:
+                    self.engine.schedule(process)
+            self.engine.add_tick_listener(self.schedule_processes)
+
+        self.create_dummy_processes()
+
+    def make_run_queue(self):
+        if isinstance(self.policy, SchedulingPolicy):
+            return copy.deepcopy(self.policy)
+        return make_scheduling_policy(self.policy, **self.policy_options)
+
+    def create_dummy_processes(self):
+        global _DUMMY_PROCESSES_CREATED
+
+        if _DUMMY_PROCESSES_CREATED or not self.background_services:
+            return
+        process_types = [
+            ("Background Service", 1),
+            ("System Monitor", 3),
+            ("File Indexer", 1),
+            ("Update Service", 2),
+            ("Cache Manager", 1),
+            ("Network Service", 2),
+            ("Security Scanner", 3),
+            ("Backup Service", 1),
+            ("Print Spooler", 2),
+            ("Search Indexer", 1)
+        ]
+        for name, priority in process_types:
+            self.process_manager.create_process(name, priority)
+        _DUMMY_PROCESSES_CREATED = True  # Set the global flag after creation
+
+
+
+
+    def terminate_process(self, pid):
+        self.process_manager.terminate_process(pid)
+
+    def get_all_processes(self):
+        return self.process_manager.snapshot()
+
+    def on_state_change(self, process):
+        pid = process.pid
+        if process.state == ProcessState.READY:
+            if pid in self.running:
+                # Gave up the CPU on its own
+                self.running.pop(pid)
+                self.cores[process.core].current = None
+            if pid not in self.ready:
+                self.ready.add(pid)
+                process.ready_since = self.engine.current_tick
+                self.pick_core(process).run_queue.enqueue(process)
+        elif process.state == ProcessState.RUNNING:
+            self.running[pid] = process
+        else:
+            if pid in self.running:
+                self.running.pop(pid)
+                self.cores[process.core].current = None
+            if pid in self.ready:
+                self.ready.discard(pid)
+                self.cores[process.core].run_queue.discard(process)
+            if process.state == ProcessState.TERMINATED and process.core is not None:
+                self.cores[process.core].run_queue.remove(process)
+        self.dirty = True
+
+    def pick_core(self, process):
+        # Stays on its previous core unless another allowed core is clearly less loaded
+        candidates = [core for core in self.cores if core.allows(process)] or self.cores
+        target = min(candidates, key=CpuCore.load)
+        if process.core is not None:
+            home = self.cores[process.core]
+            if home.allows(process) and home.load() <= target.load() + 1:
+                return home
+        self.migrate(process, target)
+        return target
+
+    def migrate(self, process, core):
+        if process.core is not None and process.core != core.core_id:
+            # Per-process policy state (virtual runtime, MLFQ level) is dropped, the process
+            # starts over in the new core's run queue
+            self.cores[process.core].run_queue.remove(process)
+            self.migrations += 1
+        process.core = core.core_id
+
+    def steal(self, core):
+        # Idle core with an empty run queue: take work from the longest allowed queue
+        victims = sorted(
+            (other for other in self.cores if other is not core and len(other.run_queue)),
+            key=lambda other: len(other.run_queue),
+            reverse=True
+        )
+        for victim in victims:
+            process = victim.run_queue.steal(core.allows)
+            if process is not None:
+                self.steals += 1
+                self.migrate(process, core)
+                return process
+        return None
+
+    def dispatch(self, core, process):
+        tick = self.engine.current_tick
+        self.ready.discard(process.pid)
+        process.wait_time += tick - process.ready_since
+        process.core = core.core_id
+        core.current = process
+        core.slice_used = 0
+        self.context_switches += 1
+        process.change_state(ProcessState.RUNNING)
+
+    def preempt(self, core, process):
+        self.preemptions += 1
+        self.running.pop(process.pid, None)
+        core.current = None
+        core.run_queue.on_preempt(process, core.slice_used)
+        process.change_state(ProcessState.READY)
+
+    def finish(self, process):
+        self.completed += 1
+        self.total_turnaround += self.engine.current_tick - process.arrival_tick
+        self.total_waiting += process.wait_time
+        self.process_manager.terminate_process(process.pid)
+
+    @instrumented()
+    def schedule_processes(self):
+        # Runs once per engine tick; with nothing running and no state change it returns at once
+        if not self.dirty and not self.running:
+            return
+        tick = self.engine.current_tick
+
+        for core in self.cores:
+            core.run_queue.on_tick(tick)
+            process = core.current
+            if process is None:
+                continue
+            if process.burst is not None and process.cpu_time >= process.burst:
+                self.finish(process)
+                continue
+            core.busy_ticks += 1
+            core.run_queue.on_run_tick(process)
+            core.slice_used += 1
+            if len(core.run_queue) and core.run_queue.should_preempt(process, core.slice_used):
+                self.preempt(core, process)
+
+        for core in self.cores:
+            if core.current is None:
+                process = core.run_queue.dequeue() or self.steal(core)
+                if process is not None:
+                    self.dispatch(core, process)
+
+        loads = [core.load() for core in self.cores]
+        self.imbalance_total += max(loads) - min(loads)
+        self.imbalance_samples += 1
+
+        # Our own changes above are already accounted for
+        self.dirty = False
+
+    def stats(self):
+        ticks = self.engine.current_tick - self.start_tick
+        return {
+            'policy': self.cores[0].run_queue.name,
+            'cpu_cores': len(self.cores),
+            'ticks': ticks,
+            'completed': self.completed,
+            'throughput': self.completed / ticks if ticks else 0.0,
+            'avg_turnaround': self.total_turnaround / self.completed if self.completed else 0.0,
+            'avg_waiting': self.total_waiting / self.completed if self.completed else 0.0,
+            'context_switches': self.context_switches,
+            'preemptions': self.preemptions,
+            'steals': self.steals,
+            'migrations': self.migrations,
+            # Average difference between the most and least loaded core (running + queued)
+            'load_imbalance': self.imbalance_total / self.imbalance_samples if self.imbalance_samples else 0.0,
+            'core_utilization': [core.busy_ticks / ticks if ticks else 0.0 for core in self.cores]
+        }
+
+
+class Process:
+    def __init__(self, pid, name, start_time):
+        self.pid = pid
+        self.name = name
+        self.start_time = start_time
+        self.status = "Running"
+
+
+class ProcessManager:
+    # The process table is written by UI callbacks and by the scheduler on the engine
+    # thread. Writes happen under a short lock and bump a version; readers get an immutable
+    # tuple of processes that is only rebuilt once the version moves, so they never
+    # iterate the live dict. Snapshot rows are captured by the engine thread after a tick,
+    # readers only swap in the latest published tuple.
+    _instance = None
+    _next_pid = 1000
+    # Size and replacement policy of the system-wide memory shared by every process
+    total_pages = 100
+    replacement_policy = None
+    # While snapshots were read in the last row_capture_idle seconds, the engine thread
+    # captures the rows after every tick, at most once per row_capture_interval seconds
+    row_capture_interval = 0.05
+    row_capture_idle = 5.0
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ProcessManager, cls).__new__(cls)
+            cls._instance.processes = {}
+            cls._instance.memory_manager = cls.make_memory_manager()
+            cls._instance.lock = RLock()
+            cls._instance.version = 0
+            cls._instance.published = (0, ())         # (version, processes)
+            cls._instance.published_rows = (None, ())  # ((version, engine version), rows)
+            cls._instance.captured_rows = (None, 0, ())  # (key, time, row tuples)
+            cls._instance.rows_read_at = 0.0  # time.monotonic() of the last snapshot() call
+            cls._instance.rows_captured_at = 0.0
+            cls._instance.row_publisher = None  # engine whose tick listener captures the rows
+        return cls._instance
+
+    @classmethod
+    def configure_memory(cls, total_pages=None, replacement_policy=None):
+        # Must be called before processes exist, the old address space is discarded.
+        # replacement_policy "none" switches a previously configured policy off
+        if total_pages is not None:
+            cls.total_pages = total_pages
+        if replacement_policy is not None:
+            cls.replacement_policy = replacement_policy
+        if cls._instance is not None:
+            if cls._instance.processes:
+                raise RuntimeError("Cannot reconfigure memory while processes are running")
+            cls._instance.memory_manager = cls.make_memory_manager()
+
+    @classmethod
+    def make_memory_manager(cls):
+        # A policy instance keeps per-page state, every memory manager gets its own copy
+        policy = cls.replacement_policy
+        if isinstance(policy, ReplacementPolicy):
+            policy = copy.deepcopy(policy)
+        return MemoryManager(cls.total_pages, policy)
+
+    def create_process(self, name, priority, memory_manager=None, burst=None, affinity=None):
+        with self.lock:
+            pid = ProcessManager._next_pid
+            ProcessManager._next_pid += 1
+        process = DummyProcess(pid, name, priority, memory_manager or self.memory_manager, burst)
+        if affinity is not None:
+            process.affinity = frozenset(affinity)
+        with self.lock:
+            self.processes[pid] = process
+            self.version += 1
+        # Outside the table lock: the engine lock is taken next, and the engine thread
+        # terminates finished processes while holding it
+        process.start()
+        return pid
+
+    def terminate_process(self, pid):
+        with self.lock:
+            process = self.processes.pop(pid, None)
+            if process is None:
+                return False
+            self.version += 1
+        process.stop()
+        return True
+
+    def get_all_processes(self):
+        # Consistent, immutable view of the table at the latest version
+        version, processes = self.published
+        if version != self.version:
+            with self.lock:
+                version = self.version
+                processes = tuple(self.processes.values())
+                self.published = (version, processes)
+        return processes
+
+    def capture_rows(self):
+        # Called with the engine lock held, so every row comes from the same tick. Only
+        # plain tuples are built here to keep the lock short, the readers make the dicts
+        engine = SimulationEngine()
+        rows = tuple(
+            (p.pid, p.name, p.state.value, p.priority, p.cpu_usage, p.start_time, p.memory.page_count)
+            for p in self.get_all_processes()
+        )
+        self.captured_rows = ((self.version, engine.version), engine.clock.now(), rows)
+        self.rows_captured_at = time.monotonic()
+
+    def publish_rows(self):
+        # Tick listener: nothing to do while nobody reads snapshots
+        now = time.monotonic()
+        if (now - self.rows_read_at <= self.row_capture_idle
+                and now - self.rows_captured_at >= self.row_capture_interval):
+            self.capture_rows()
+
+    def snapshot(self):
+        # Plain dicts with the accounting data the monitors show, in pid order (pids are
+        # handed out in increasing order), shared by every reader: treat them as read-only.
+        # While the engine thread keeps up, a reader only swaps in the rows it captured
+        # after the latest tick. The reader captures them itself (under the engine lock)
+        # when there is no engine thread, when the table changed since the capture, so
+        # a process just created or ended shows up right away, or when the capture is
+        # older than row_capture_interval, e.g. after nobody read for a while.
+        engine = SimulationEngine()
+        read_at = time.monotonic()
+        self.rows_read_at = read_at
+        current = (self.version, engine.version)
+        key, rows = self.published_rows
+        if key == current:
+            return rows
+        if self.row_publisher is not engine:
+            self.row_publisher = engine
+            engine.add_tick_listener(self.publish_rows)
+        captured_key, now, captured = self.captured_rows
+        if (captured_key is None or not engine.is_running or captured_key[0] != self.version
+                or (captured_key != current and read_at - self.rows_captured_at > self.row_capture_interval)):
+            with engine.lock:
+                self.capture_rows()
+            captured_key, now, captured = self.captured_rows
+        if captured_key == key:
+            return rows
+        rows = tuple(
+            {
+                'pid': pid,
+                'name': name,
+                'state': state,
+                'priority': priority,
+                'cpu_usage': cpu_usage,
+                'running_time': int(now - start_time),
+                'page_count': page_count
+            }
+            for pid, name, state, priority, cpu_usage, start_time, page_count in captured
+        )
+        self.published_rows = (captured_key, rows)
+        return rows
+
+
+class RingBuffer:
+    # Fixed-size array-backed buffer, the oldest value is overwritten once it is full
+    def __init__(self, capacity, typecode='f'):
+        self.capacity = capacity
+        self.data = array(typecode, [0]) * capacity
+        self.next = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, value):
+        self.data[self.next] = value
+        self.next = (self.next + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def values(self, count=None):
+        # The newest `count` values (all by default), oldest first
+        count = self.size if count is None else min(count, self.size)
+        start = (self.next - count) % self.capacity
+        if start + count <= self.capacity:
+            return self.data[start:start + count].tolist()
+        return self.data[start:].tolist() + self.data[:self.next].tolist()
+
+    def nbytes(self):
+        return self.data.itemsize * self.capacity
+
+
+class MetricSeries:
+    # One metric kept at several resolutions: [(step in seconds, number of points)].
+    # Every level averages the samples falling into each step-sized bucket of simulation
+    # time; a finished bucket is pushed into that level's ring buffer, so memory stays
+    # bounded however long the series runs.
+    def __init__(self, resolutions):
+        self.steps = [step for step, _ in resolutions]
+        self.buffers = [RingBuffer(capacity) for _, capacity in resolutions]
+        self.buckets = [None] * len(resolutions)  # bucket currently being filled
+        self.totals = [0.0] * len(resolutions)
+        self.counts = [0] * len(resolutions)
+
+    def add(self, timestamp, value):
+        for level, step in enumerate(self.steps):
+            bucket = int(timestamp // step)
+            if bucket != self.buckets[level]:
+                if self.counts[level]:
+                    self.buffers[level].append(self.totals[level] / self.counts[level])
+                self.buckets[level] = bucket
+                self.totals[level] = 0.0
+                self.counts[level] = 0
+            self.totals[level] += value
+            self.counts[level] += 1
+
+    def values(self, step, count=None):
+        # Points of the level with this step, oldest first, ending with the average of
+        # the bucket still being filled
+        level = self.steps.index(step)
+        points = self.buffers[level].values(None if count is None else count - 1)
+        if self.counts[level]:
+            points.append(self.totals[level] / self.counts[level])
+        return points if count is None else points[-count:]
+
+    def nbytes(self):
+        return sum(buffer.nbytes() for buffer in self.buffers)
+
+
+class MetricsHistory:
+    # Retained metrics for the monitors, fed one sample at a time (see MetricsSampler in
+    # Main.py). System-wide series keep 1 h at 1 s, 6 h at 10 s and 24 h at 1 min; each
+    # process keeps 5 min, 1 h and 4 h, about 7 KB per process for both of its metrics.
+    # Series of processes that are gone are dropped.
+    SYSTEM_RESOLUTIONS = [(1, 3600), (10, 2160), (60, 1440)]
+    PROCESS_RESOLUTIONS = [(1, 300), (10, 360), (60, 240)]
+    SYSTEM_METRICS = ['cpu_usage', 'memory_percent', 'running', 'processes']
+    PROCESS_METRICS = ['cpu_usage', 'page_count']
+
+    def __init__(self, system_resolutions=None, process_resolutions=None):
+        self.system_resolutions = system_resolutions or self.SYSTEM_RESOLUTIONS
+        self.process_resolutions = process_resolutions or self.PROCESS_RESOLUTIONS
+        self.system = {name: MetricSeries(self.system_resolutions) for name in self.SYSTEM_METRICS}
+        self.processes = {}  # pid -> {metric: MetricSeries}
+
+    def record(self, sample):
+        # sample: {'time', 'processes': snapshot rows, 'memory': {'total_pages', 'used_pages'}}
+        now = sample['time']
+        rows = sample['processes']
+        memory = sample['memory']
+
+        cpu_total = 0
+        running = 0
+        seen = set()
+        for row in rows:
+            pid = row['pid']
+            seen.add(pid)
+            series = self.processes.get(pid)
+            if series is None:
+                series = self.processes[pid] = {
+                    name: MetricSeries(self.process_resolutions) for name in self.PROCESS_METRICS
+                }
+            for name in self.PROCESS_METRICS:
+                series[name].add(now, row[name])
+            cpu_total += row['cpu_usage']
+            if row['state'] == ProcessState.RUNNING.value:
+                running += 1
+        if len(seen) != len(self.processes):
+            for pid in [pid for pid in self.processes if pid not in seen]:
+                del self.processes[pid]
+
+        self.system['cpu_usage'].add(now, cpu_total)
+        self.system['memory_percent'].add(now, memory['used_pages'] * 100 / (memory['total_pages'] or 1))
+        self.system['running'].add(now, running)
+        self.system['processes'].add(now, len(rows))
+
+    def system_values(self, name, step=1, count=None):
+        return self.system[name].values(step, count)
+
+    def process_values(self, pid, name, step=1, count=None):
+        series = self.processes.get(pid)
+        return series[name].values(step, count) if series else []
+
+    def nbytes(self):
+        total = sum(series.nbytes() for series in self.system.values())
+        for metrics in self.processes.values():
+            total += sum(series.nbytes() for series in metrics.values())
+        return total
+
+
+def reset_simulation():
+    # Drops the engine, process table and scheduler so the next run starts from scratch.
+    # Settings made through the configure() class methods are kept.
+    global _DUMMY_PROCESSES_CREATED
+    if SimulationEngine._instance is not None:
+        SimulationEngine._instance.stop()
+    SimulationEngine._instance = None
+    ProcessManager._instance = None
+    ProcessScheduler._instance = None
+    ProcessManager._next_pid = 1000
+    _DUMMY_PROCESSES_CREATED = False
+    SimulationClock().reset()
@@ -0,0 +1,112 @@
+# Opt-in instrumentation of the hot paths: timer callbacks of the monitor windows, the
+# File Explorer and Terminal, and the simulation engine and scheduler loop.
+#
+#   PYOS_PROFILE=1 python Main.py        record timings from the start
+#   python Main.py --profile             same
+#
+# Recording can also be switched on and off from the Performance window, which lists the
+# slowest operations and can save a cProfile dump of the UI thread (open it with
+# `python -m pstats file.prof` or snakeviz).
+#
+# While recording is off an instrumented call only costs a flag check and one extra call.
+
+import cProfile
+import functools
+import os
+import threading
+import time
+
+enabled = os.environ.get("PYOS_PROFILE", "") not in ("", "0")
+
+_stats = {}  # (name, thread name) -> CallStats
+_lock = threading.Lock()
+_profiler = None
+
+
+class CallStats:
+    def __init__(self, name, thread):
+        self.name = name
+        self.thread = thread
+        self.calls = 0
+        self.total = 0.0  # seconds
+        self.max = 0.0
+        self.last = 0.0
+
+    @property
+    def average(self):
+        return self.total / self.calls if self.calls else 0.0
+
+
+def record(name, elapsed):
+    thread = threading.current_thread().name
+    with _lock:
+        stats = _stats.get((name, thread))
+        if stats is None:
+            stats = _stats[(name, thread)] = CallStats(name, thread)
+        stats.calls += 1
+        stats.total += elapsed
+        stats.last = elapsed
+        if elapsed > stats.max:
+            stats.max = elapsed
+
+
+def instrumented(name=None):
+    # Decorator timing every call of the function while recording is enabled
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def report(sort="max"):
+    # CallStats of every instrumented operation, slowest first ("max", "total" or "average")
+    with _lock:
+        rows = list(_stats.values())
+    return sorted(rows, key=lambda stats: getattr(stats, sort), reverse=True)
+
+
+def start_profile():
+    # cProfile only sees the thread that starts it, call this from the UI thread
+    global _profiler
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def stop_profile(path):
+    global _profiler
+    if _profiler is None:
+        return None
+    _profiler.disable()
+    _profiler.dump_stats(path)
+    _profiler = None
+    return path
+
+
+def is_profiling():
+    return _profiler is not None
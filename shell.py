@@ -0,0 +1,627 @@
+# Built-in Terminal commands that run inside Py-OS instead of spawning a shell. Each
+# command is a generator yielding output lines, so the Terminal can draw long output a
+# page at a time without blocking the desktop, and commands can be chained with '|':
+#
+#   cat log.txt | grep -i error | tail -n 5
+#   ps | grep Running | wc -l
+#
+# Besides lines, commands yield None now and then while they work without output (a long
+# find or grep), so the Terminal can hand control back to the event loop in time.
+# Commands reading another command's output pass these heartbeats on.
+#
+# A line using anything else the system shell would interpret (redirection, ';', '&&',
+# variables), a command that is not built in or an option a built-in does not implement
+# is left to the system shell.
+
+import bisect
+import fnmatch
+import glob
+import itertools
+import os
+import re
+import shlex
+import time
+from collections import deque
+
+from kernel import ProcessManager
+
+
+HEARTBEAT_LINES = 1000  # input lines or directory entries between heartbeats
+
+
+class ShellError(Exception):
+    # Shown to the user as the command's error message
+    pass
+
+
+class NotBuiltin(Exception):
+    # Raised while the pipeline is built for an option the built-in does not implement,
+    # the line then goes to the system shell
+    pass
+
+
+class ShellContext:
+    # What built-ins may touch besides their arguments and input
+    def __init__(self, cwd, kill_process=None):
+        self.cwd = cwd
+        # kill_process(pid) -> bool; the Terminal also closes the window owning the pid
+        self.kill_process = kill_process or ProcessManager().terminate_process
+
+
+def split_flags(args, known):
+    # Splits ["-la", "x"] into ({"l", "a"}, ["x"]); "--" ends the flags
+    flags = set()
+    operands = []
+    for index, arg in enumerate(args):
+        if arg == "--":
+            operands.extend(args[index + 1:])
+            break
+        if arg.startswith("--"):
+            raise NotBuiltin(arg)
+        if os.name == "nt" and arg.startswith("/"):
+            raise NotBuiltin(arg)  # cmd.exe switch such as /s or /a:h
+        if arg.startswith("-") and len(arg) > 1:
+            for flag in arg[1:]:
+                if flag not in known:
+                    raise NotBuiltin(arg)
+                flags.add(flag)
+        else:
+            operands.append(arg)
+    return flags, operands
+
+
+def has_magic(pattern):
+    return any(char in pattern for char in "*?[")
+
+
+def resolve(cwd, path):
+    return os.path.normpath(os.path.join(cwd, os.path.expanduser(path)))
+
+
+def expand_paths(cwd, operands):
+    # Globs are expanded like a shell would, relative to the Terminal's directory
+    paths = []
+    for operand in operands:
+        if has_magic(operand):
+            matches = sorted(glob.glob(resolve(cwd, operand)))
+            if not matches:
+                raise ShellError(f"{operand}: No such file or directory")
+            paths.extend((os.path.relpath(match, cwd) if not os.path.isabs(operand) else match, match)
+                         for match in matches)
+        else:
+            paths.append((operand, resolve(cwd, operand)))
+    return paths  # [(name as shown, absolute path)]
+
+
+def read_lines(path, name):
+    if os.path.isdir(path):
+        raise ShellError(f"{name}: Is a directory")
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as file:
+            for number, line in enumerate(file, 1):
+                yield line.rstrip("\r\n")
+                if number % HEARTBEAT_LINES == 0:
+                    yield None
+    except FileNotFoundError:
+        raise ShellError(f"{name}: No such file or directory")
+
+
+def input_lines(shell, operands, stdin):
+    # Lines of the named files one after another, or the piped input without operands
+    if not operands:
+        return [(None, stdin if stdin is not None else iter(()))]
+    return [(name, read_lines(path, name)) for name, path in expand_paths(shell.cwd, operands)]
+
+
+def line_count_option(args, default=10):
+    # -n N, -nN or -N as in head and tail
+    count = default
+    operands = []
+    args = iter(args)
+    for arg in args:
+        if arg == "--":
+            operands.extend(args)
+            break
+        if arg == "-n":
+            value = next(args, None)
+            if value is None:
+                raise ShellError("option requires an argument -- 'n'")
+        elif arg.startswith("-n"):
+            value = arg[2:]
+        elif arg.startswith("-") and arg[1:].isdigit():
+            value = arg[1:]
+        elif arg.startswith("-") and len(arg) > 1:
+            raise NotBuiltin(arg)  # -f, -c, --lines=...
+        else:
+            operands.append(arg)
+            continue
+        if value.startswith("+"):
+            raise NotBuiltin(arg)  # from line N on
+        if not value.isdigit():
+            raise ShellError(f"invalid number of lines: '{value}'")
+        count = int(value)
+    return count, operands
+
+
+# ls / dir
+
+LIST_FLAGS = "laStrh"
+
+
+def format_size(size, human):
+    if not human:
+        return str(size)
+    for unit in ["B", "K", "M", "G"]:
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}T"
+
+
+def scan(directory, pattern=None, show_hidden=False):
+    # DirEntry objects of a directory; names and file types come with the directory
+    # read, no per-entry stat is done here
+    with os.scandir(directory) as entries:
+        return [
+            entry for entry in entries
+            if (show_hidden or not entry.name.startswith("."))
+            and (pattern is None or fnmatch.fnmatch(entry.name, pattern))
+        ]
+
+
+def list_directory(cwd, args, long_format=False):
+    # ls [-l] [-a] [-S | -t] [-r] [-h] [path or glob ...]
+    #   -l  long format (date, size or <DIR>, name)     -a  include hidden entries
+    #   -S  largest first    -t  newest first    -r  reverse the order    -h  human sizes
+    flags, operands = split_flags(args, LIST_FLAGS)
+    long_format = long_format or "l" in flags
+    show_hidden = "a" in flags
+
+    groups = []  # (heading, entries)
+    for operand in operands or ["."]:
+        path = resolve(cwd, operand)
+        if has_magic(os.path.basename(path)):
+            directory, pattern = os.path.split(path)
+            if not os.path.isdir(directory):
+                raise ShellError(f"cannot access '{operand}': No such file or directory")
+            # A pattern naming hidden files explicitly matches them
+            entries = scan(directory, pattern, show_hidden or pattern.startswith("."))
+            if not entries:
+                raise ShellError(f"cannot access '{operand}': No such file or directory")
+            groups.append((None, entries))
+        elif os.path.isdir(path):
+            groups.append((operand if len(operands) > 1 else None, scan(path, None, show_hidden)))
+        elif os.path.exists(path):
+            directory, name = os.path.split(path)
+            groups.append((None, scan(directory, name, True)))
+        else:
+            raise ShellError(f"cannot access '{operand}': No such file or directory")
+    return list_groups(groups, flags, long_format)
+
+
+def list_groups(groups, flags, long_format):
+    # stat() is only paid for when sizes or times are needed
+    need_stat = long_format or "S" in flags or "t" in flags
+    for number, (heading, entries) in enumerate(groups):
+        if heading is not None:
+            if number:
+                yield ""
+            yield f"{heading}:"
+        if need_stat:
+            rows = []
+            for index, entry in enumerate(entries, 1):
+                if index % HEARTBEAT_LINES == 0:
+                    yield None
+                try:
+                    rows.append((entry, entry.stat()))
+                except OSError:
+                    continue  # removed while listing, or a dangling link
+        else:
+            rows = [(entry, None) for entry in entries]
+
+        if "S" in flags:
+            rows.sort(key=lambda row: (-row[1].st_size, row[0].name.lower()))
+        elif "t" in flags:
+            rows.sort(key=lambda row: (-row[1].st_mtime, row[0].name.lower()))
+        else:
+            rows.sort(key=lambda row: row[0].name.lower())
+        if "r" in flags:
+            rows.reverse()
+
+        for entry, stat in rows:
+            if not long_format:
+                yield entry.name + ("/" if entry.is_dir() else "")
+                continue
+            modified = time.strftime("%Y-%m-%d  %H:%M", time.localtime(stat.st_mtime))
+            if entry.is_dir():
+                yield f"{modified}    <DIR>          {entry.name}"
+            else:
+                yield f"{modified}    {format_size(stat.st_size, 'h' in flags):>14} {entry.name}"
+
+
+def ls(shell, args, stdin):
+    return list_directory(shell.cwd, args)
+
+
+def dir_(shell, args, stdin):
+    return list_directory(shell.cwd, args, long_format=True)
+
+
+# Text commands
+
+# Every built-in checks its arguments when it is called, while the pipeline is built,
+# and returns the generator producing its output
+
+def echo(shell, args, stdin):
+    if args and args[0] in ("-n", "-e", "-E"):
+        raise NotBuiltin(args[0])
+    return iter([" ".join(args)])
+
+
+def cat(shell, args, stdin):
+    _, operands = split_flags(args, "")
+    return itertools.chain.from_iterable(lines for _, lines in input_lines(shell, operands, stdin))
+
+
+def head(shell, args, stdin):
+    count, operands = line_count_option(args)
+    return head_lines(input_lines(shell, operands, stdin), count)
+
+
+def head_lines(sources, count):
+    for number, (name, lines) in enumerate(sources):
+        if len(sources) > 1:
+            if number:
+                yield ""
+            yield f"==> {name} <=="
+        shown = 0
+        for line in lines:
+            if shown >= count:
+                break
+            if line is not None:
+                shown += 1
+            yield line
+
+
+def tail(shell, args, stdin):
+    count, operands = line_count_option(args)
+    return tail_lines(input_lines(shell, operands, stdin), count)
+
+
+def tail_lines(sources, count):
+    for number, (name, lines) in enumerate(sources):
+        if len(sources) > 1:
+            if number:
+                yield ""
+            yield f"==> {name} <=="
+        last = deque(maxlen=count)
+        for line in lines:
+            if line is None:
+                yield None
+            elif count:
+                last.append(line)
+        yield from last
+
+
+def grep(shell, args, stdin):
+    # grep [-i] [-v] [-n] [-c] pattern [file ...]
+    flags, operands = split_flags(args, "ivnc")
+    if not operands:
+        raise ShellError("usage: grep [-ivnc] pattern [file ...]")
+    try:
+        pattern = re.compile(operands[0], re.IGNORECASE if "i" in flags else 0)
+    except re.error as e:
+        raise ShellError(f"invalid pattern: {e}")
+    return grep_lines(input_lines(shell, operands[1:], stdin), pattern, flags)
+
+
+def grep_lines(sources, pattern, flags):
+    invert = "v" in flags
+    for name, lines in sources:
+        prefix = f"{name}:" if len(sources) > 1 else ""
+        matches = 0
+        number = 0
+        for line in lines:
+            if line is None:
+                yield None
+                continue
+            number += 1
+            if (pattern.search(line) is None) == invert:
+                matches += 1
+                if "c" not in flags:
+                    yield f"{prefix}{number}:{line}" if "n" in flags else prefix + line
+        if "c" in flags:
+            yield f"{prefix}{matches}"
+
+
+def wc(shell, args, stdin):
+    # wc [-l] [-w] [-c] [file ...], all three counts without options
+    flags, operands = split_flags(args, "lwc")
+    shown = [flag for flag in "lwc" if flag in flags] or ["l", "w", "c"]
+    return count_lines(input_lines(shell, operands, stdin), shown)
+
+
+def count_lines(sources, shown):
+    totals = {"l": 0, "w": 0, "c": 0}
+    for name, lines in sources:
+        counts = {"l": 0, "w": 0, "c": 0}
+        for line in lines:
+            if line is None:
+                yield None
+                continue
+            counts["l"] += 1
+            counts["w"] += len(line.split())
+            counts["c"] += len(line) + 1
+        for flag in counts:
+            totals[flag] += counts[flag]
+        yield " ".join(f"{counts[flag]:>7}" for flag in shown) + (f" {name}" if name else "")
+    if len(sources) > 1:
+        yield " ".join(f"{totals[flag]:>7}" for flag in shown) + " total"
+
+
+def find(shell, args, stdin):
+    # find [path ...] [-name pattern] [-type f|d]
+    paths = []
+    name_pattern = None
+    entry_type = None
+    args = iter(args)
+    for arg in args:
+        if arg == "-name":
+            name_pattern = next(args, None)
+            if name_pattern is None:
+                raise ShellError("missing argument to '-name'")
+        elif arg == "-type":
+            entry_type = next(args, None)
+            if entry_type is None:
+                raise ShellError("missing argument to '-type'")
+            if entry_type not in ("f", "d"):
+                raise NotBuiltin(arg)  # links, sockets, ...
+        elif arg.startswith("-") or arg == "!":
+            raise NotBuiltin(arg)
+        else:
+            paths.append(arg)
+    if os.name == "nt" and paths and (paths[0].startswith("/") or not os.path.exists(resolve(shell.cwd, paths[0]))):
+        # cmd's own find: find [/i /v /c ...] "text" [file ...] searches files for a string
+        raise NotBuiltin(paths[0])
+    return find_entries(shell, paths, name_pattern, entry_type)
+
+
+def find_entries(shell, paths, name_pattern, entry_type):
+    def wanted(name, is_dir):
+        if entry_type == "f" and is_dir or entry_type == "d" and not is_dir:
+            return False
+        return name_pattern is None or fnmatch.fnmatch(name, name_pattern)
+
+    for shown in paths or ["."]:
+        root = resolve(shell.cwd, shown)
+        if not os.path.exists(root):
+            raise ShellError(f"'{shown}': No such file or directory")
+        if wanted(os.path.basename(root), os.path.isdir(root)):
+            yield shown
+        # os.walk reads each directory once with scandir
+        for directory, dirs, files in os.walk(root):
+            yield None
+            dirs.sort()
+            relative = os.path.relpath(directory, root)
+            base = shown if relative == "." else os.path.join(shown, relative)
+            for name in dirs:
+                if wanted(name, True):
+                    yield os.path.join(base, name)
+            for name in sorted(files):
+                if wanted(name, False):
+                    yield os.path.join(base, name)
+
+
+# Simulated processes
+
+def ps(shell, args, stdin):
+    if args:
+        raise NotBuiltin(args[0])
+    return process_rows()
+
+
+def process_rows():
+    yield f"{'PID':>6}  {'NAME':<22} {'STATE':<10} {'PRI':>3} {'CPU%':>5} {'PAGES':>6} {'TIME':>6}"
+    for row in ProcessManager().snapshot():
+        minutes, seconds = divmod(row['running_time'], 60)
+        yield (f"{row['pid']:>6}  {row['name'][:22]:<22} {row['state']:<10} {row['priority']:>3} "
+               f"{row['cpu_usage']:>5} {row['page_count']:>6} {minutes:>3}:{seconds:02d}")
+
+
+def kill(shell, args, stdin):
+    if not args:
+        raise ShellError("usage: kill pid ...")
+    for arg in args:
+        if arg.startswith("-"):
+            raise NotBuiltin(arg)  # signals and -l
+    return kill_processes(shell, args)
+
+
+def kill_processes(shell, args):
+    for arg in args:
+        if not arg.isdigit():
+            yield f"kill: {arg}: arguments must be process IDs"
+        elif not shell.kill_process(int(arg)):
+            yield f"kill: ({arg}) - No such process"
+
+
+BUILTINS = {
+    "cat": cat,
+    "dir": dir_,
+    "echo": echo,
+    "find": find,
+    "grep": grep,
+    "head": head,
+    "kill": kill,
+    "ls": ls,
+    "ps": ps,
+    "tail": tail,
+    "wc": wc
+}
+
+# Tokens only the system shell understands
+SHELL_SYNTAX = {";", "&", "&&", "||", "<", ">", ">>", "2>", "&>", "(", ")"}
+
+
+def split_command(command):
+    # Words of the command line with '|' and other shell operators as separate tokens
+    lexer = shlex.shlex(command, posix=True, punctuation_chars="|&;<>()")
+    lexer.whitespace_split = True
+    if os.name == "nt":
+        lexer.escape = ""  # backslashes are path separators there
+    return list(lexer)
+
+
+def build_pipeline(command, shell):
+    # Output lines of the command when every stage is built in, otherwise None so the
+    # caller hands the line to the system shell. Raises ShellError for invalid arguments
+    if any(char in command for char in "$`%"):
+        return None
+    try:
+        tokens = split_command(command)
+    except ValueError:
+        return None
+    stages = [[]]
+    for token in tokens:
+        if token in SHELL_SYNTAX:
+            return None
+        if token == "|":
+            stages.append([])
+        else:
+            stages[-1].append(token)
+    if any(not stage or stage[0] not in BUILTINS for stage in stages):
+        return None
+
+    # Each stage pulls lines from the one before it, nothing runs until the output is read
+    lines = None
+    try:
+        for name, *args in stages:
+            lines = BUILTINS[name](shell, args, lines)
+    except NotBuiltin:
+        return None
+    return lines
+
+
+# History and completion for the Terminal input line
+
+class CommandHistory:
+    # Append-only history file, read the first time the history is needed. Besides the
+    # chronological list, the distinct commands are kept sorted so all commands starting
+    # with a prefix are one bisect away, however long the history gets.
+    max_entries = 100000
+    _instances = {}
+
+    def __init__(self, path):
+        self.path = path
+        self.loaded = False
+        self.entries = []   # chronological, oldest first
+        self.last_use = {}  # command -> index of its latest use, least recently used first
+        self.sorted = []    # distinct commands in sort order
+        self.last_query = (None, [])  # an incremental search narrows the previous result
+
+    @classmethod
+    def open(cls, path):
+        # Terminals sharing a history file share one instance
+        path = os.path.abspath(path)
+        if path not in cls._instances:
+            cls._instances[path] = CommandHistory(path)
+        return cls._instances[path]
+
+    def load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            with open(self.path, 'r', encoding='utf-8', errors='replace') as file:
+                lines = deque((line.rstrip("\n") for line in file), maxlen=self.max_entries)
+        except FileNotFoundError:
+            lines = ()
+        for command in lines:
+            if command:
+                self.remember(command)
+        self.sorted = sorted(self.last_use)
+
+    def remember(self, command):
+        self.last_use.pop(command, None)
+        self.last_use[command] = len(self.entries)
+        self.entries.append(command)
+
+    def add(self, command):
+        command = command.strip()
+        if not command or "\n" in command:
+            return
+        if self.loaded:
+            if self.entries and self.entries[-1] == command:
+                return
+            if command not in self.last_use:
+                bisect.insort(self.sorted, command)
+            self.remember(command)
+            self.last_query = (None, [])
+        try:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(command + "\n")
+        except OSError:
+            pass  # history is a convenience, a read-only home must not break commands
+
+    def matches(self, prefix=""):
+        # Distinct commands starting with prefix, most recently used first
+        self.load()
+        if not prefix:
+            return list(reversed(self.last_use))
+        previous, found = self.last_query
+        if previous is not None and prefix.startswith(previous):
+            found = [command for command in found if command.startswith(prefix)]
+        else:
+            found = self.prefix_matches(prefix)
+        self.last_query = (prefix, found)
+        return found
+
+    def prefix_matches(self, prefix):
+        start = bisect.bisect_left(self.sorted, prefix)
+        end = bisect.bisect_left(self.sorted, prefix + "\U0010ffff")
+        if (end - start) * 8 > len(self.sorted):
+            # A short prefix matching much of the history: one pass in recency order
+            # is cheaper than sorting the matches
+            return [command for command in reversed(self.last_use) if command.startswith(prefix)]
+        found = self.sorted[start:end]
+        found.sort(key=self.last_use.__getitem__, reverse=True)
+        return found
+
+
+class PathCompleter:
+    # Completes file and directory names; listings are cached per directory and only
+    # read again when the directory's modification time changes
+    def __init__(self):
+        self.listings = {}  # directory -> (mtime, [(name, is_dir)])
+
+    def listing(self, directory):
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return []
+        cached = self.listings.get(directory)
+        if cached is None or cached[0] != mtime:
+            try:
+                with os.scandir(directory) as entries:
+                    names = sorted((entry.name, entry.is_dir()) for entry in entries)
+            except OSError:
+                names = []
+            cached = self.listings[directory] = (mtime, names)
+        return cached[1]
+
+    def complete(self, cwd, word):
+        # (completed word, candidates): the word extended as far as all candidates agree,
+        # and the candidate names when more than one remains
+        directory_part, partial = os.path.split(word)
+        directory = resolve(cwd, directory_part) if directory_part else cwd
+        show_hidden = partial.startswith(".")
+        candidates = [
+            name + (os.sep if is_dir else "")
+            for name, is_dir in self.listing(directory)
+            if name.startswith(partial) and (show_hidden or not name.startswith("."))
+        ]
+        if not candidates:
+            return word, []
+        common = os.path.commonprefix(candidates)
+        completed = os.path.join(directory_part, common) if directory_part else common
+        return completed, candidates if len(candidates) > 1 else []